@@ -3,13 +3,12 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
 import os
-import subprocess
 import sys
-import time
-from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .profiles import Profile
 
 
 class AgentConfig:
@@ -28,29 +27,60 @@ class AgentConfig:
 
 
 def build_env_vars_anthropic(profile, proxy_url: str, api_key: str) -> dict[str, str]:
-    """Build environment variables for Anthropic API."""
-    env = {}
-    env["ANTHROPIC_AUTH_TOKEN"] = api_key
-    env["ANTHROPIC_BASE_URL"] = proxy_url
-    env["API_TIMEOUT_MS"] = "3000000"
-
-    if profile.meta.haiku_model:
-        env["ANTHROPIC_DEFAULT_HAIKU_MODEL"] = profile.meta.haiku_model
-    if profile.meta.sonnet_model:
-        env["ANTHROPIC_DEFAULT_SONNET_MODEL"] = profile.meta.sonnet_model
-    if profile.meta.opus_model:
-        env["ANTHROPIC_DEFAULT_OPUS_MODEL"] = profile.meta.opus_model
+    """Build environment variables for Anthropic API (used by `with` and `env`)."""
+    env = {
+        "ANTHROPIC_AUTH_TOKEN": api_key,
+        "ANTHROPIC_BASE_URL": proxy_url,
+        "API_TIMEOUT_MS": "3000000",
+    }
+
+    meta = profile.meta
+    for tier, model in (("HAIKU", meta.haiku_model), ("SONNET", meta.sonnet_model), ("OPUS", meta.opus_model)):
+        if model:
+            env[f"ANTHROPIC_DEFAULT_{tier}_MODEL"] = model
 
     return env
 
 
 def build_env_vars_openai(profile, proxy_url: str, api_key: str) -> dict[str, str]:
     """Build environment variables for OpenAI-compatible API."""
-    env = {}
-    env["OPENAI_API_KEY"] = api_key
-    env["OPENAI_BASE_URL"] = proxy_url
+    return {
+        "OPENAI_API_KEY": api_key,
+        "OPENAI_BASE_URL": proxy_url,
+    }
 
-    return env
+
+def activate_profile(
+    profile_name: str,
+    refresh: bool = False,
+    debug: bool = False,
+) -> Profile | None:
+    """Load a profile and log its models.
+
+    Shared by `enter` and `with`. Prints an error and returns None if the
+    profile is not found.
+    """
+    from . import profiles
+
+    if refresh:
+        print("[REFRESH] Clearing model/profile caches", file=sys.stderr)
+        profiles.clear_caches()
+
+    profile = profiles.load_profile(profile_name, debug=debug)
+    if profile is None:
+        print(f"Error: Profile not found: {profile_name}", file=sys.stderr)
+        return None
+
+    # Log profile selection and models
+    model_list = profile.model_list
+    log = [
+        f"[PROFILE_SELECTED] '{profile_name}' ({profile.meta.name})\n",
+        f"[MODELS_FOR_REGISTRATION] {len(model_list)} models:\n",
+    ]
+    log.extend([f"  - {m.model_name}\n" for m in model_list])
+    sys.stderr.write("".join(log))
+
+    return profile
 
 
 def cmd_run_agent(
@@ -66,9 +96,9 @@ def cmd_run_agent(
         debug: Enable debug output
 
     Returns:
-        Exit code from subprocess
+        Exit code on failure; on success the process is replaced by the agent
     """
-    from . import profiles, proxy
+    from . import proxy
 
     # argparse.REMAINDER absorbs --refresh into args.cmd; extract it manually
     refresh = getattr(args, 'refresh', False)
@@ -78,23 +108,15 @@ def cmd_run_agent(
 
     profile_name = args.profile
 
-    if refresh:
-        print("[REFRESH] Clearing model/profile caches", file=sys.stderr)
-        profiles.clear_caches()
-
-    profile = profiles.load_profile(profile_name, debug=debug)
+    profile = activate_profile(profile_name, refresh=refresh, debug=debug)
     if profile is None:
-        print(f"Error: Profile not found: {profile_name}", file=sys.stderr)
         return 1
 
-    # Log profile selection and models
-    print(f"[PROFILE_SELECTED] '{profile_name}' ({profile.meta.name})", file=sys.stderr)
-    print(f"[MODELS_FOR_REGISTRATION] {len(profile.model_list)} models:", file=sys.stderr)
-    for m in profile.model_list:
-        print(f"  - {m.model_name}", file=sys.stderr)
+    # The config file below needs plain dicts for every model
+    model_defs = [m.to_dict() for m in profile.model_list]
 
     # Verify profile has models resolved
-    if not profile.model_list:
+    if not model_defs:
         print(f"Warning: Profile '{profile_name}' has no models resolved.", file=sys.stderr)
         print(f"  Check that model definitions exist for:", file=sys.stderr)
         if profile.meta.opus_model:
@@ -104,9 +126,6 @@ def cmd_run_agent(
         if profile.meta.haiku_model:
             print(f"    haiku_model: {profile.meta.haiku_model}", file=sys.stderr)
 
-    # Get model definitions for config generation
-    model_defs = [m.to_dict() for m in profile.model_list]
-
     # Ensure proxy is running with profile's models
     # start_proxy handles: stale PIDs, unhealthy state, and retries on transient failures
     config_path = str(proxy.generate_litellm_config(model_defs=model_defs)) if model_defs else None
@@ -127,37 +146,34 @@ def cmd_run_agent(
         if debug and added > 0:
             print(f"Added {added} model(s) to proxy", file=sys.stderr)
 
-    # Build environment
-    env = os.environ.copy()
-
-    # Add agent-specific environment variables
+    # Build environment: agent-specific variables overlaid on the current env
     proxy_url = proxy.get_proxy_url()
     api_key = proxy.get_api_key()
     agent_env = agent_config.env_vars_fn(profile, proxy_url, api_key)
-    env.update(agent_env)
+    env = {**os.environ, **agent_env}
 
     # Determine command to run
     cmd = args.cmd if args.cmd else agent_config.default_cmd
 
-    # Print status (reuse existing function if needed)
-    from . import state
-    st = state.load_state()
-    proxy_status = proxy.get_status()
-
+    # Print status. start_proxy() above already verified health, so querying
+    # the proxy again is only worth the round-trips in debug mode.
     print(f"\n=== {agent_config.agent_name.capitalize()} Agent Status ===", file=sys.stderr)
-    if proxy_status.running:
+    if debug:
+        proxy_status = proxy.get_proxy_status()
         health = "healthy" if proxy_status.healthy else "unhealthy"
         print(f"Proxy: running ({health}) - {proxy_status.url}", file=sys.stderr)
         print(f"Models: {proxy_status.model_count}", file=sys.stderr)
+    else:
+        print(f"Proxy: running - {proxy_url}", file=sys.stderr)
+        print(f"Models: {len(model_defs)} (profile)", file=sys.stderr)
     print(f"Profile: {profile_name} ({profile.meta.name})", file=sys.stderr)
     print(f"Command: {' '.join(cmd)}\n", file=sys.stderr)
 
-    # Execute
+    # Execute: replace this process with the agent (nothing runs after it exits)
+    sys.stdout.flush()
+    sys.stderr.flush()
     try:
-        result = subprocess.run(cmd, env=env)
-        return result.returncode
+        os.execvpe(cmd[0], cmd, env)
     except FileNotFoundError:
         print(f"Error: Command not found: {cmd[0]}", file=sys.stderr)
         return 1
-    except KeyboardInterrupt:
-        return 130
@@ -7,9 +7,10 @@ Handles request transformations for providers with strict input requirements
 
 from __future__ import annotations
 
-import copy
+import functools
+import logging
 import sys
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
 try:
     from litellm.integrations.custom_logger import CustomLogger
@@ -19,43 +20,88 @@ except ImportError:
     CustomLogger = object
     UserAPIKeyAuth = Any
 
+logger = logging.getLogger("run-claude.callbacks")
+
+# Hot keys and block types, interned so lookups against interned
+# decoder keys hit CPython's pointer-equality fast path
+_TOOL_USE = sys.intern("tool_use")
+_TEXT = sys.intern("text")
+_IMAGE = sys.intern("image")
+_IMAGE_URL = sys.intern("image_url")
+_CACHE_CONTROL = sys.intern("cache_control")
+_PSF = sys.intern("provider_specific_fields")
 
 # Providers that need special handling
-STRICT_PROVIDERS = {
+STRICT_PROVIDERS = frozenset({
     "groq",
     "cerebras",
     "together",
     "anyscale",
-}
+})
 
 # Fields to strip from tool_use blocks for strict providers
-TOOL_USE_STRIP_FIELDS = {
-    "provider_specific_fields",
-    "cache_control",  # Some providers don't support cache hints
-}
+TOOL_USE_STRIP_FIELDS = frozenset({
+    _PSF,
+    _CACHE_CONTROL,  # Some providers don't support cache hints
+})
 
 # Fields to strip from message content blocks
-CONTENT_STRIP_FIELDS = {
-    "cache_control",
-}
+CONTENT_STRIP_FIELDS = frozenset({
+    _CACHE_CONTROL,
+})
+
+# Fields to strip from tool definitions and their function dicts
+TOOL_DEF_STRIP_FIELDS = frozenset({
+    _CACHE_CONTROL,
+})
 
 # Fields to strip from the message dict itself (not content blocks)
-MESSAGE_STRIP_FIELDS = {
+MESSAGE_STRIP_FIELDS = frozenset({
     "thinking_blocks",
+})
+
+# Content block type -> fields to strip from blocks of that type
+_BLOCK_STRIP: dict[str, frozenset[str]] = {
+    _TOOL_USE: TOOL_USE_STRIP_FIELDS,
+    _TEXT: CONTENT_STRIP_FIELDS,
+    _IMAGE: CONTENT_STRIP_FIELDS,
+    _IMAGE_URL: CONTENT_STRIP_FIELDS,
 }
 
+# Fields to strip from single dict-shaped content (union computed once)
+_ALL_STRIP_FIELDS = TOOL_USE_STRIP_FIELDS | CONTENT_STRIP_FIELDS
 
+# Top-level request fields rejected by strict providers
+_TOP_LEVEL_STRIP = frozenset({
+    _PSF,
+    _CACHE_CONTROL,
+    "output_config",
+})
+
+# Same fields as a tuple, for the per-request pop loop
+_TOP_POP = tuple(_TOP_LEVEL_STRIP)
+
+
+@functools.lru_cache(maxsize=256)
 def _get_provider_from_model(model: str) -> str | None:
-    """Extract provider name from model string (e.g., 'groq/llama3-8b' -> 'groq')."""
-    if "/" in model:
-        return model.split("/")[0].lower()
-    return None
+    """Extract provider name from model string (e.g., 'groq/llama3-8b' -> 'groq').
+
+    Memoized: a proxy serves a small, fixed set of model strings.
+    """
+    head, sep, _ = model.partition("/")
+    return head.lower() if sep else None
 
 
-def _strip_fields_from_content(content: Any, fields_to_strip: set[str]) -> Any:
+def _strip_fields_from_content(
+    content: Any,
+    fields_to_strip: frozenset[str] = _ALL_STRIP_FIELDS,
+) -> Any:
     """
     Recursively strip specified fields from message content.
 
+    Filtering and recursion happen in a single comprehension per dict,
+    so no intermediate dict is built.
+
     Args:
         content: Message content (string, list, or dict)
         fields_to_strip: Set of field names to remove
@@ -63,60 +109,107 @@ def _strip_fields_from_content(content: Any, fields_to_strip: set[str]) -> Any:
     Returns:
         Cleaned content with fields stripped
     """
-    if isinstance(content, dict):
-        # Remove specified fields from this dict
-        cleaned = {k: v for k, v in content.items() if k not in fields_to_strip}
-        # Recursively clean nested values
-        for key, value in cleaned.items():
-            cleaned[key] = _strip_fields_from_content(value, fields_to_strip)
-        return cleaned
-    elif isinstance(content, list):
-        return [_strip_fields_from_content(item, fields_to_strip) for item in content]
+    _isinstance = isinstance
+    _strip = _strip_fields_from_content
+
+    if _isinstance(content, dict):
+        return {
+            k: _strip(v, fields_to_strip)
+            for k, v in content.items()
+            if k not in fields_to_strip
+        }
+    elif _isinstance(content, list):
+        return [_strip(item, fields_to_strip) for item in content]
     else:
         return content
 
 
+def _copy_without(d: dict[str, Any], fields: frozenset[str]) -> dict[str, Any]:
+    """Return a shallow copy of ``d`` with ``fields`` removed."""
+    c = d.copy()
+    for f in fields:
+        c.pop(f, None)
+    return c
+
+
+def _messages_need_cleaning(messages: list[dict[str, Any]]) -> bool:
+    """Check whether any message carries a field that strict providers reject."""
+    for msg in messages:
+        if not MESSAGE_STRIP_FIELDS.isdisjoint(msg):
+            return True
+        content = msg.get("content")
+        if isinstance(content, list):
+            for block in content:
+                if isinstance(block, dict) and not _ALL_STRIP_FIELDS.isdisjoint(block):
+                    return True
+        elif isinstance(content, dict):
+            # Dict content is stripped recursively; let the full cleaner handle it
+            return True
+    return False
+
+
 def _clean_tool_use_blocks(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
     """
     Remove problematic fields from tool_use blocks in messages.
 
     Some providers (like Groq) return 400 errors when receiving fields
     like 'provider_specific_fields' in tool_use content blocks.
+
+    Returns the original list unchanged when nothing needs stripping.
     """
+    if not _messages_need_cleaning(messages):
+        return messages
+
+    # Bind globals/builtins used in the loops to locals (LOAD_FAST)
+    _isinstance = isinstance
+    _dict = dict
+    _list = list
+    _str = str
+    _copy = _copy_without
+    _msg_strip = MESSAGE_STRIP_FIELDS
+    _all_strip = _ALL_STRIP_FIELDS
+    _block_strip = _BLOCK_STRIP.get
+
     cleaned_messages = []
 
     for msg in messages:
-        msg_copy = {k: v for k, v in msg.items() if k not in MESSAGE_STRIP_FIELDS}
-        content = msg_copy.get("content")
-
-        if isinstance(content, list):
+        content = msg.get("content")
+
+        # Pass untouched messages through by reference
+        if _msg_strip.isdisjoint(msg) and (
+            content is None
+            or _isinstance(content, _str)
+            or (
+                _isinstance(content, _list)
+                and not any(
+                    _isinstance(block, _dict) and not _all_strip.isdisjoint(block)
+                    for block in content
+                )
+            )
+        ):
+            cleaned_messages.append(msg)
+            continue
+
+        msg_copy = _copy(msg, _msg_strip)
+
+        if _isinstance(content, _list):
             cleaned_content = []
             for block in content:
-                if isinstance(block, dict):
-                    block_type = block.get("type", "")
-
-                    if block_type == "tool_use":
-                        # Strip problematic fields from tool_use blocks
-                        cleaned_block = {
-                            k: v for k, v in block.items()
-                            if k not in TOOL_USE_STRIP_FIELDS
-                        }
-                        cleaned_content.append(cleaned_block)
-                    elif block_type in ("text", "image", "image_url"):
-                        # Strip cache_control and similar from content blocks
-                        cleaned_block = {
-                            k: v for k, v in block.items()
-                            if k not in CONTENT_STRIP_FIELDS
-                        }
-                        cleaned_content.append(cleaned_block)
-                    else:
-                        cleaned_content.append(block)
-                else:
+                if not _isinstance(block, _dict):
                     cleaned_content.append(block)
+                    continue
+
+                # Unknown block types and blocks without strip fields pass through
+                strip = _block_strip(block.get("type"))
+                if strip is None or strip.isdisjoint(block):
+                    cleaned_content.append(block)
+                    continue
+
+                cleaned_content.append(_copy(block, strip))
             msg_copy["content"] = cleaned_content
-        elif isinstance(content, dict):
+        elif _isinstance(content, _dict):
             # Single content block as dict
-            msg_copy["content"] = _strip_fields_from_content(content, TOOL_USE_STRIP_FIELDS | CONTENT_STRIP_FIELDS)
+            msg_copy["content"] = _strip_fields_from_content(content, _all_strip)
 
         cleaned_messages.append(msg_copy)
 
@@ -128,29 +221,118 @@ def _clean_tools_definition(tools: list[dict[str, Any]] | None) -> list[dict[str
     Clean tool definitions for strict providers.
 
     Some providers don't accept certain fields in tool schemas.
+    Returns the original list unchanged when no tool carries cache_control.
     """
     if not tools:
         return tools
 
+    _isinstance = isinstance
+    _dict = dict
+    _cc = _CACHE_CONTROL
+    _copy = _copy_without
+    _strip = TOOL_DEF_STRIP_FIELDS
+
+    if not any(
+        _cc in tool
+        or (_isinstance(tool.get("function"), _dict) and _cc in tool["function"])
+        for tool in tools
+    ):
+        return tools
+
     cleaned_tools = []
     for tool in tools:
-        tool_copy = copy.deepcopy(tool)
-
-        # Remove cache_control from tool definitions if present
-        if "cache_control" in tool_copy:
-            del tool_copy["cache_control"]
+        # Shallow copy without cache_control; nested schemas are never
+        # mutated, so they are shared with the original by reference
+        tool_copy = _copy(tool, _strip)
 
-        # Clean function parameters if present
-        if "function" in tool_copy and isinstance(tool_copy["function"], dict):
-            func = tool_copy["function"]
-            if "cache_control" in func:
-                del func["cache_control"]
+        # Clean function definition if present
+        func = tool_copy.get("function")
+        if _isinstance(func, _dict) and _cc in func:
+            tool_copy["function"] = _copy(func, _strip)
 
         cleaned_tools.append(tool_copy)
 
     return cleaned_tools
 
 
+def _make_cleaner(
+    top_level_fields: tuple[str, ...] = _TOP_POP,
+    clean_messages: bool = True,
+    clean_tools: bool = True,
+) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """
+    Build an in-place request cleaner specialized for one provider.
+
+    Phases a provider doesn't need are left out of the closure entirely,
+    so the per-request path has no provider conditionals.
+    """
+    def _clean(data: dict[str, Any]) -> dict[str, Any]:
+        # The cleaners return their input unchanged when nothing was
+        # stripped; only write back on a real change so an untouched
+        # request keeps the identity of its messages/tools lists
+        if clean_messages and "messages" in data:
+            messages = data["messages"]
+            cleaned = _clean_tool_use_blocks(messages)
+            if cleaned is not messages:
+                data["messages"] = cleaned
+        if clean_tools and "tools" in data:
+            tools = data["tools"]
+            cleaned = _clean_tools_definition(tools)
+            if cleaned is not tools:
+                data["tools"] = cleaned
+        for field in top_level_fields:
+            data.pop(field, None)
+        return data
+
+    return _clean
+
+
+# Provider -> request cleaner, built once at import
+_CLEANERS: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    provider: _make_cleaner() for provider in STRICT_PROVIDERS
+}
+
+
+def _apply_transform_inplace(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Clean a request dict in place for its model's provider.
+
+    Single code path shared by the callback, the proxy hook and
+    transform_request_for_provider. Non-strict providers pass through.
+    """
+    cleaner = _CLEANERS.get(_get_provider_from_model(data.get("model", "")))
+    if cleaner is None:
+        return data
+    return cleaner(data)
+
+
+def _build_model_cleaners(
+    model_list: list[dict[str, Any]],
+) -> dict[str, Callable[[dict[str, Any]], dict[str, Any]] | None]:
+    """
+    Map deployment model names to their provider's cleaner.
+
+    Both the public ``model_name`` and the underlying ``litellm_params.model``
+    are keyed, so requests resolve with one dict lookup whether or not
+    the alias carries a provider prefix. Listed non-strict models map to
+    None; names that aren't listed at all (wildcard deployments, direct
+    ``provider/model`` strings) are left to the provider-prefix check.
+    """
+    cleaners: dict[str, Callable[[dict[str, Any]], dict[str, Any]] | None] = {}
+    for entry in model_list:
+        model_name = entry.get("model_name") or ""
+        underlying = (entry.get("litellm_params") or {}).get("model") or ""
+        cleaner = (
+            _CLEANERS.get(_get_provider_from_model(underlying))
+            or _CLEANERS.get(_get_provider_from_model(model_name))
+        )
+        for name in (model_name, underlying):
+            # A strict deployment wins over a non-strict one with the same name
+            if name and (cleaner is not None or name not in cleaners):
+                cleaners[name] = cleaner
+    return cleaners
+
+
 def transform_request_for_provider(
     model: str,
     messages: list[dict[str, Any]],
@@ -169,25 +351,20 @@ def transform_request_for_provider(
     Returns:
         Tuple of (cleaned_messages, cleaned_tools, cleaned_kwargs)
     """
-    provider = _get_provider_from_model(model)
+    # **kwargs is a fresh dict owned by this call, so it doubles as the
+    # request dict; model/messages/tools can't collide with its keys
+    data = kwargs
+    data["model"] = model
+    data["messages"] = messages
+    if tools is not None:
+        data["tools"] = tools
 
-    # Only transform for strict providers
-    if provider not in STRICT_PROVIDERS:
-        return messages, tools, kwargs
+    _apply_transform_inplace(data)
 
-    # Clean messages
-    cleaned_messages = _clean_tool_use_blocks(messages)
-
-    # Clean tools
-    cleaned_tools = _clean_tools_definition(tools)
-
-    # Clean kwargs - remove any provider-specific fields at top level
-    cleaned_kwargs = {
-        k: v for k, v in kwargs.items()
-        if k not in {"provider_specific_fields", "cache_control", "output_config"}
-    }
-
-    return cleaned_messages, cleaned_tools, cleaned_kwargs
+    del data["model"]
+    cleaned_messages = data.pop("messages")
+    cleaned_tools = data.pop("tools", None)
+    return cleaned_messages, cleaned_tools, data
 
 
 class ProviderCompatCallback(CustomLogger):
@@ -201,11 +378,40 @@ class ProviderCompatCallback(CustomLogger):
         litellm_settings:
           callbacks:
             - run_claude.callbacks.ProviderCompatCallback
+
+    Optionally pass ``model_list`` (the deployment's LiteLLM model list) to
+    resolve strict models with a single lookup instead of parsing each model
+    string. This is opt-in: run-claude registers models through the proxy API
+    after startup, so the generated config does not pass a list. Models that
+    are not in the list still fall back to the provider-prefix check. To use
+    it, point LiteLLM at an instance built in your own module:
+
+        # custom_callbacks.py
+        from run_claude.callbacks import ProviderCompatCallback
+        proxy_handler_instance = ProviderCompatCallback(model_list=[
+            {"model_name": "fast", "litellm_params": {"model": "groq/llama3-8b-8192"}},
+        ])
+
+        # config.yaml
+        litellm_settings:
+          callbacks: custom_callbacks.proxy_handler_instance
+
+    Debug output goes to the ``run-claude.callbacks`` logger; enable it with
+    the application's logging configuration.
     """
 
+    # CustomLogger doesn't declare slots, so instances still get a __dict__
+    # for its attributes; these live in slot descriptors.
+    __slots__ = ("_model_cleaners",)
+
     def __init__(self, **kwargs: Any) -> None:
-        super().__init__(**kwargs) if hasattr(super(), '__init__') else None
-        self.debug = kwargs.get("debug", False)
+        # object.__init__ (litellm-less fallback) rejects keyword arguments
+        if CustomLogger is object:
+            super().__init__()
+        else:
+            super().__init__(**kwargs)
+        model_list = kwargs.get("model_list")
+        self._model_cleaners = _build_model_cleaners(model_list) if model_list else None
 
     async def async_pre_call_hook(
         self,
@@ -219,31 +425,26 @@ class ProviderCompatCallback(CustomLogger):
 
         This is called by LiteLLM proxy before making the API call.
         """
-        model = data.get("model", "")
-        provider = _get_provider_from_model(model)
-
-        # Only transform for strict providers
-        if provider not in STRICT_PROVIDERS:
-            return data
-
-        if self.debug:
-            print(f"[ProviderCompatCallback] Transforming request for {provider}", file=sys.stderr)
-
-        # Transform messages
-        if "messages" in data:
-            data["messages"] = _clean_tool_use_blocks(data["messages"])
-
-        # Transform tools
-        if "tools" in data:
-            data["tools"] = _clean_tools_definition(data["tools"])
+        model_cleaners = self._model_cleaners
+        model = data.get("model")
+        if model_cleaners is not None and model in model_cleaners:
+            cleaner = model_cleaners[model]
+            if cleaner is None:
+                return data
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[ProviderCompatCallback] Transforming request for %s", model)
+            return cleaner(data)
+
+        # Unlisted models fall back to the provider prefix
+
+        if logger.isEnabledFor(logging.DEBUG):
+            provider = _get_provider_from_model(data.get("model", ""))
+            if provider in STRICT_PROVIDERS:
+                logger.debug("[ProviderCompatCallback] Transforming request for %s", provider)
 
-        # Remove top-level problematic fields
-        for field in ["provider_specific_fields", "cache_control", "output_config"]:
-            data.pop(field, None)
+        return _apply_transform_inplace(data)
 
-        return data
-
-    def log_pre_api_call(
+    async def async_log_pre_api_call(
         self,
         model: str,
         messages: list[dict[str, Any]],
@@ -253,14 +454,15 @@ class ProviderCompatCallback(CustomLogger):
         Called before API call - can be used for logging/debugging.
 
         Note: This is called after async_pre_call_hook, so transformations
-        should already be applied.
+        should already be applied. Async so LiteLLM awaits it on the event
+        loop instead of dispatching a sync callback to its thread pool.
         """
-        if self.debug:
+        if logger.isEnabledFor(logging.DEBUG):
             provider = _get_provider_from_model(model)
             if provider in STRICT_PROVIDERS:
-                print(f"[ProviderCompatCallback] Pre-API call to {model}", file=sys.stderr)
+                logger.debug("[ProviderCompatCallback] Pre-API call to %s", model)
 
-    def log_success_event(
+    async def async_log_success_event(
         self,
         kwargs: dict[str, Any],
         response_obj: Any,
@@ -270,7 +472,7 @@ class ProviderCompatCallback(CustomLogger):
         """Called on successful API response."""
         pass
 
-    def log_failure_event(
+    async def async_log_failure_event(
         self,
         kwargs: dict[str, Any],
         response_obj: Any,
@@ -278,11 +480,11 @@ class ProviderCompatCallback(CustomLogger):
         end_time: Any,
     ) -> None:
         """Called on failed API response."""
-        if self.debug:
+        if logger.isEnabledFor(logging.DEBUG):
             model = kwargs.get("model", "")
             provider = _get_provider_from_model(model)
             if provider in STRICT_PROVIDERS:
-                print(f"[ProviderCompatCallback] API call failed for {model}", file=sys.stderr)
+                logger.debug("[ProviderCompatCallback] API call failed for %s", model)
 
 
 # Standalone function for use as proxy hook (alternative to callback class)
@@ -295,24 +497,6 @@ def standardize_request(litellm_params: dict[str, Any]) -> dict[str, Any]:
           proxy_hooks:
             - run_claude.callbacks.provider_compat.standardize_request
     """
-    kwargs = litellm_params.get("kwargs", {})
-    model = kwargs.get("model", "")
-
-    provider = _get_provider_from_model(model)
-    if provider not in STRICT_PROVIDERS:
-        return litellm_params
-
-    # Transform messages
-    if "messages" in kwargs:
-        kwargs["messages"] = _clean_tool_use_blocks(kwargs["messages"])
-
-    # Transform tools
-    if "tools" in kwargs:
-        kwargs["tools"] = _clean_tools_definition(kwargs["tools"])
-
-    # Remove problematic top-level fields
-    for field in ["provider_specific_fields", "cache_control", "output_config"]:
-        kwargs.pop(field, None)
-
-    litellm_params["kwargs"] = kwargs
+    # Cleans the kwargs dict in place; non-strict providers pass through
+    _apply_transform_inplace(litellm_params.get("kwargs", {}))
     return litellm_params
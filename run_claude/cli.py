@@ -8,60 +8,50 @@ Directory-aware model routing via LiteLLM proxy.
 from __future__ import annotations
 
 import argparse
-import hashlib
 import os
 import sys
-import time
 from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
 
 
-def main() -> int:
-    # Ensure config is initialized on first run
-    from . import profiles, config
-    profiles.ensure_initialized()
-
-    # Ensure secrets template exists
-    debug = "--debug" in sys.argv or "-d" in sys.argv
-    config.ensure_secrets_template(debug=debug)
-
-    parser = argparse.ArgumentParser(
-        prog="run-claude",
-        description="Agent shim controller for Claude - launch claude with mode list profile",
-    )
-    parser.add_argument("--debug", "-d", action="store_true", help="Enable debug output")
-    subparsers = parser.add_subparsers(dest="command", help="Commands")
-
-    # enter
+def _add_enter_parser(subparsers: argparse._SubParsersAction) -> None:
     enter_p = subparsers.add_parser("enter", help="Enter a shimmed directory")
     enter_p.add_argument("token", help="Directory token")
     enter_p.add_argument("profile", help="Profile name")
     enter_p.add_argument("--dir", help="Directory path (default: cwd)")
     enter_p.add_argument("--refresh", action="store_true", help="Force reload model definitions and re-register with proxy")
 
-    # leave
+
+def _add_leave_parser(subparsers: argparse._SubParsersAction) -> None:
     leave_p = subparsers.add_parser("leave", help="Leave a shimmed directory")
     leave_p.add_argument("token", help="Directory token")
 
-    # janitor
+
+def _add_janitor_parser(subparsers: argparse._SubParsersAction) -> None:
     janitor_p = subparsers.add_parser("janitor", help="Clean up expired leases")
     janitor_p.add_argument("--quiet", "-q", action="store_true", help="Suppress output")
     janitor_p.add_argument("--force", "-f", action="store_true", help="Run even if recently ran")
 
-    # set-folder
+
+def _add_set_folder_parser(subparsers: argparse._SubParsersAction) -> None:
     setfolder_p = subparsers.add_parser("set-folder", help="Configure current directory")
     setfolder_p.add_argument("profile", help="Profile name")
     setfolder_p.add_argument("--dir", help="Directory path (default: cwd)")
 
-    # status
+
+def _add_status_parser(subparsers: argparse._SubParsersAction) -> None:
     status_p = subparsers.add_parser("status", help="Show current state")
     status_p.add_argument("--health", action="store_true", help="Show formatted health endpoint response")
 
-    # env
+
+def _add_env_parser(subparsers: argparse._SubParsersAction) -> None:
     env_p = subparsers.add_parser("env", help="Print environment variables for a profile")
     env_p.add_argument("profile", help="Profile name")
     env_p.add_argument("--export", "-e", action="store_true", help="Print export statements")
 
-    # proxy subcommands
+
+def _add_proxy_parser(subparsers: argparse._SubParsersAction) -> None:
     proxy_p = subparsers.add_parser("proxy", help="Proxy management")
     proxy_sub = proxy_p.add_subparsers(dest="proxy_command")
     proxy_start_p = proxy_sub.add_parser("start", help="Start proxy")
@@ -73,7 +63,8 @@ def main() -> int:
     proxy_sub.add_parser("health", help="Health check")
     proxy_sub.add_parser("db-test", help="Test database connection")
 
-    # db subcommands
+
+def _add_db_parser(subparsers: argparse._SubParsersAction) -> None:
     db_p = subparsers.add_parser("db", help="Database container management")
     db_sub = db_p.add_subparsers(dest="db_command")
     db_sub.add_parser("start", help="Start database container")
@@ -82,7 +73,8 @@ def main() -> int:
     db_sub.add_parser("status", help="Database container status")
     db_sub.add_parser("migrate", help="Run prisma migrate with LiteLLM config")
 
-    # profiles subcommands
+
+def _add_profiles_parser(subparsers: argparse._SubParsersAction) -> None:
     profiles_p = subparsers.add_parser("profiles", help="Profile management")
     profiles_sub = profiles_p.add_subparsers(dest="profiles_command")
     profiles_sub.add_parser("list", help="List available profiles")
@@ -90,7 +82,8 @@ def main() -> int:
     show_p.add_argument("name", help="Profile name")
     profiles_sub.add_parser("install", help="Create user profiles config template")
 
-    # models subcommands
+
+def _add_models_parser(subparsers: argparse._SubParsersAction) -> None:
     models_p = subparsers.add_parser("models", help="Model definitions management")
     models_sub = models_p.add_subparsers(dest="models_command")
     models_sub.add_parser("list", help="List available model definitions")
@@ -99,17 +92,24 @@ def main() -> int:
     wipe_p = models_sub.add_parser("wipe", help="Delete all models from proxy database")
     wipe_p.add_argument("--force", "-f", action="store_true", help="Skip confirmation prompt")
 
+
+def _add_with_parser(
+    subparsers: argparse._SubParsersAction, agent: str = "Claude", default_cmd: str = "claude"
+) -> None:
     # run - run a command with profile environment
-    run_p = subparsers.add_parser("with", help="Run Claude with a profile")
-    #run_p.add_argument("keyword", choices=["with"], help="Keyword 'with' to specify profile")
+    run_p = subparsers.add_parser("with", help=f"Run {agent} with a profile")
     run_p.add_argument("profile", help="Profile name")
-    run_p.add_argument("cmd", nargs=argparse.REMAINDER, help="Command to run (default: claude)")
+    run_p.add_argument("cmd", nargs=argparse.REMAINDER, help=f"Command to run (default: {default_cmd})")
     run_p.add_argument("--refresh", action="store_true", help="Force reload model definitions and re-register with proxy")
 
+
+def _add_install_parser(subparsers: argparse._SubParsersAction) -> None:
     # install - create user config templates and infrastructure
     install_p = subparsers.add_parser("install", help="Create user config templates for profiles and models")
     install_p.add_argument("--force", "-f", action="store_true", help="Overwrite existing files")
 
+
+def _add_secrets_parser(subparsers: argparse._SubParsersAction) -> None:
     # secrets - manage secrets configuration
     secrets_p = subparsers.add_parser("secrets", help="Manage secrets configuration")
     secrets_sub = secrets_p.add_subparsers(dest="secrets_command")
@@ -121,47 +121,186 @@ def main() -> int:
     secrets_sub.add_parser("path", help="Show secrets file path")
     secrets_sub.add_parser("export", help="Export secrets to .env file for docker compose")
 
-    args = parser.parse_args()
 
-    if args.command is None:
-        parser.print_help()
-        return 0
+# Subcommand name -> subparser builder, in help display order
+_PARSER_BUILDERS = {
+    "enter": _add_enter_parser,
+    "leave": _add_leave_parser,
+    "janitor": _add_janitor_parser,
+    "set-folder": _add_set_folder_parser,
+    "status": _add_status_parser,
+    "env": _add_env_parser,
+    "proxy": _add_proxy_parser,
+    "db": _add_db_parser,
+    "profiles": _add_profiles_parser,
+    "models": _add_models_parser,
+    "with": _add_with_parser,
+    "install": _add_install_parser,
+    "secrets": _add_secrets_parser,
+}
+
+
+# Subcommand name -> handler function name (resolved late via globals())
+_DISPATCH = {
+    "enter": "cmd_enter",
+    "leave": "cmd_leave",
+    "janitor": "cmd_janitor",
+    "set-folder": "cmd_set_folder",
+    "status": "cmd_status",
+    "env": "cmd_env",
+    "proxy": "cmd_proxy",
+    "db": "cmd_db",
+    "profiles": "cmd_profiles",
+    "models": "cmd_models",
+    "with": "cmd_run",
+    "install": "cmd_install",
+    "secrets": "cmd_secrets",
+}
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    """Return the subcommand in argv if it is a known one.
+
+    The only global options are flags, so the first non-flag token is
+    the subcommand. Returns None (build the full parser) for top-level
+    help, no args, or unknown tokens.
+    """
+    for arg in argv:
+        if arg.startswith("-"):
+            if arg in ("-h", "--help"):
+                return None
+            continue
+        return arg if arg in _PARSER_BUILDERS else None
+    return None
+
+
+# Argument-free invocations that bypass argparse: words -> extra attributes
+_NO_ARG_COMMANDS = {
+    ("status",): {"health": False},
+    ("proxy", "status"): {"proxy_command": "status"},
+    ("proxy", "health"): {"proxy_command": "health"},
+    ("profiles", "list"): {"profiles_command": "list"},
+    ("models", "list"): {"models_command": "list"},
+}
+
+
+# Commands that bypass argparse when given only plain positionals:
+# command -> (positional names, collects trailing words as `cmd`, defaults)
+_POSITIONAL_COMMANDS = {
+    "enter": (("token", "profile"), False, {"dir": None, "refresh": False}),
+    "leave": (("token",), False, {}),
+    "env": (("profile",), False, {"export": False}),
+    "with": (("profile",), True, {"refresh": False}),
+}
+
+
+def _fast_args(argv: list[str]) -> SimpleNamespace | None:
+    """Build args directly for simple invocations, or None to use argparse.
+
+    Handles the argument-free commands and the common positional-only forms
+    (enter/leave/env/with). Only leading --debug/-d flags are accepted; any
+    other option (including --help) falls through to the real parser.
+    """
+    debug = False
+    i = 0
+    while i < len(argv) and argv[i] in ("--debug", "-d"):
+        debug = True
+        i += 1
+    words = argv[i:]
+
+    extra = _NO_ARG_COMMANDS.get(tuple(words))
+    if extra is not None:
+        return SimpleNamespace(command=words[0], debug=debug, **extra)
+
+    spec = _POSITIONAL_COMMANDS.get(words[0]) if words else None
+    if spec is None:
+        return None
+    names, takes_rest, defaults = spec
+    values = words[1:1 + len(names)]
+    rest = words[1 + len(names):]
+    if len(values) != len(names) or any(v.startswith("-") for v in values):
+        return None
+    if rest and not takes_rest:
+        return None
+
+    args = SimpleNamespace(command=words[0], debug=debug, **defaults, **dict(zip(names, values)))
+    if takes_rest:
+        # Mirrors argparse.REMAINDER: everything after the positionals
+        args.cmd = rest
+    return args
+
+
+# Python 3.14+ colorizes argparse help, probing the environment and terminal
+# for every formatter it creates. Keep help plain (and cheap) unless the user
+# opts in with PYTHON_COLORS=1. Older versions don't accept the argument.
+if sys.version_info >= (3, 14):
+    _PARSER_KWARGS = {"color": os.environ.get("PYTHON_COLORS") == "1"}
+else:
+    _PARSER_KWARGS = {}
+
+
+def _ensure_secrets(debug: bool = False) -> None:
+    """Create the secrets template on first use.
+
+    The secrets file doubles as the "initialized" flag: once it exists a
+    single stat is enough and the template (and PyYAML) is never touched.
+    """
+    from . import config
+
+    if debug or not config.get_secrets_file().exists():
+        config.ensure_secrets_template(debug=debug)
+
 
-    # Dispatch
-    if args.command == "enter":
-        return cmd_enter(args)
-    elif args.command == "leave":
-        return cmd_leave(args)
-    elif args.command == "janitor":
-        return cmd_janitor(args)
-    elif args.command == "set-folder":
-        return cmd_set_folder(args)
-    elif args.command == "status":
-        return cmd_status(args)
-    elif args.command == "env":
-        return cmd_env(args)
-    elif args.command == "proxy":
-        return cmd_proxy(args)
-    elif args.command == "db":
-        return cmd_db(args)
-    elif args.command == "profiles":
-        return cmd_profiles(args)
-    elif args.command == "models":
-        return cmd_models(args)
-    elif args.command == "with":
-        return cmd_run(args)
-    elif args.command == "install":
-        return cmd_install(args)
-    elif args.command == "secrets":
-        return cmd_secrets(args)
+def _build_parser(
+    command: str | None = None,
+    *,
+    prog: str = "run-claude",
+    description: str = "Agent shim controller for Claude - launch claude with mode list profile",
+    builders: dict[str, Callable[[argparse._SubParsersAction], None]] = _PARSER_BUILDERS,
+) -> argparse.ArgumentParser:
+    """Build the CLI parser.
+
+    When ``command`` is given only that subparser is constructed; otherwise
+    the full tree is built (needed for top-level help and error messages).
+    run-open-code passes its own prog, description and builders.
+    """
+    parser = argparse.ArgumentParser(prog=prog, description=description, **_PARSER_KWARGS)
+    parser.add_argument("--debug", "-d", action="store_true", help="Enable debug output")
+    subparsers = parser.add_subparsers(dest="command", help="Commands")
+
+    if command is not None:
+        builders[command](subparsers)
     else:
-        parser.print_help()
-        return 1
+        for build in builders.values():
+            build(subparsers)
+
+    return parser
+
+
+def main() -> int:
+    args = _fast_args(sys.argv[1:])
+    if args is None:
+        # Only build the subparser that will actually be used
+        parser = _build_parser(_sniff_subcommand(sys.argv[1:]))
+        args = parser.parse_args()
+
+        if args.command is None:
+            parser.print_help()
+            return 0
+
+        if args.command not in _DISPATCH:
+            parser.print_help()
+            return 1
+
+    _ensure_secrets(args.debug)
+
+    return globals()[_DISPATCH[args.command]](args)
 
 
 def cmd_enter(args: argparse.Namespace) -> int:
     """Handle enter command."""
-    from . import state, profiles, proxy
+    from . import agent_runner, state, profiles, proxy
+    profiles.ensure_initialized()
 
     debug = getattr(args, 'debug', False)
     refresh = getattr(args, 'refresh', False)
@@ -169,32 +308,23 @@ def cmd_enter(args: argparse.Namespace) -> int:
     profile_name = args.profile
     directory = args.dir or os.getcwd()
 
-    if refresh:
-        print("[REFRESH] Clearing model/profile caches", file=sys.stderr)
-        profiles.clear_caches()
-
     # Load profile
-    profile = profiles.load_profile(profile_name, debug=debug)
+    profile = agent_runner.activate_profile(profile_name, refresh=refresh, debug=debug)
     if profile is None:
-        print(f"Error: Profile not found: {profile_name}", file=sys.stderr)
         return 1
-
-    # Log profile selection and models
-    print(f"[PROFILE_SELECTED] '{profile_name}' ({profile.meta.name})", file=sys.stderr)
-    print(f"[MODELS_FOR_REGISTRATION] {len(profile.model_list)} models:", file=sys.stderr)
-    for m in profile.model_list:
-        print(f"  - {m.model_name}", file=sys.stderr)
+    model_list = profile.model_list
 
     # Ensure proxy is running with profile's models
-    model_defs = [m.to_dict() for m in profile.model_list]
     if not proxy.is_proxy_running():
+        model_defs = [m.to_dict() for m in model_list]
         config_path = str(proxy.generate_litellm_config(model_defs=model_defs)) if model_defs else None
         if not proxy.start_proxy(config_path=config_path):
             print("Warning: Failed to start proxy", file=sys.stderr)
-    elif model_defs:
-        # Add any missing models via API (no restart needed)
+    elif model_list:
+        # Add any missing models via API (no restart needed); ensure_models
+        # only converts the ones it actually posts to dicts.
         # Wait for recovery if proxy is not immediately healthy
-        added, skipped = proxy.ensure_models(model_defs, debug=debug, wait_for_recovery=True, force=refresh)
+        added, skipped = proxy.ensure_models(model_list, debug=debug, wait_for_recovery=True, force=refresh)
         if debug and added > 0:
             print(f"Added {added} model(s) to proxy", file=sys.stderr)
 
@@ -234,16 +364,23 @@ def cmd_leave(args: argparse.Namespace) -> int:
 
 def cmd_janitor(args: argparse.Namespace) -> int:
     """Handle janitor command."""
+    import time
     from . import state, proxy
 
-    st = state.load_state()
+    now = time.time()
 
-    # Rate limit: only run once per minute unless forced
+    # Rate limit: only run once per minute unless forced. Checked against the
+    # stamp file's mtime so the common no-op run never parses state.json.
     if not args.force:
-        if time.time() - st.last_janitor_run < 60:
-            return 0
+        try:
+            if now - state.get_janitor_stamp_file().stat().st_mtime < 60:
+                return 0
+        except FileNotFoundError:
+            pass
 
-    st.last_janitor_run = time.time()
+    state.touch_janitor_stamp()
+    st = state.load_state()
+    st.last_janitor_run = now
 
     # Find expired leases
     expired = state.get_expired_leases(st)
@@ -269,33 +406,8 @@ def cmd_janitor(args: argparse.Namespace) -> int:
     return 0
 
 
-def cmd_set_folder(args: argparse.Namespace) -> int:
-    """Handle set-folder command."""
-    from . import profiles
-
-    debug = getattr(args, 'debug', False)
-    profile_name = args.profile
-    directory = Path(args.dir) if args.dir else Path.cwd()
-
-    # Verify profile exists
-    profile = profiles.load_profile(profile_name, debug=debug)
-    if profile is None:
-        print(f"Error: Profile not found: {profile_name}", file=sys.stderr)
-        return 1
-
-    # Generate token from canonical path
-    canonical = directory.resolve()
-    token = hashlib.sha256(str(canonical).encode()).hexdigest()[:16]
-
-    envrc_path = directory / ".envrc"
-    envrc_user_path = directory / ".envrc.user"
-    gitignore_path = directory / ".gitignore"
-
-    created_envrc = False
-
-    # Create .envrc if missing
-    if not envrc_path.exists():
-        envrc_content = f'''# Claude Switch - Auto-generated
+# Files written by set-folder
+_ENVRC_TEMPLATE = '''# Claude Switch - Auto-generated
 # Edit .envrc.user for customization (gitignored)
 
 # Stable token for this directory
@@ -309,12 +421,8 @@ if [[ -n "$AGENT_SHIM_PROFILE" ]]; then
     eval "$(run-claude env "$AGENT_SHIM_PROFILE" 2>/dev/null)"
 fi
 '''
-        envrc_path.write_text(envrc_content)
-        created_envrc = True
-        print(f"Created: {envrc_path}")
 
-    # Create/update .envrc.user
-    envrc_user_content = f'''# Claude Switch User Config
+_ENVRC_USER_TEMPLATE = '''# Claude Switch User Config
 # This file is gitignored - add your customizations here
 
 export AGENT_SHIM_PROFILE="{profile_name}"
@@ -325,31 +433,78 @@ export AGENT_SHIM_PROFILE="{profile_name}"
 # Optional: Client-specific settings
 # export AGENT_SHIM_CLIENT="claude"
 '''
-    envrc_user_path.write_text(envrc_user_content)
-    print(f"Created: {envrc_user_path}")
+
+
+def _write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path unless it already holds exactly that. Returns True if written."""
+    data = content.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
+def cmd_set_folder(args: argparse.Namespace) -> int:
+    """Handle set-folder command."""
+    import hashlib
+    from . import profiles
+    profiles.ensure_initialized()
+
+    debug = getattr(args, 'debug', False)
+    profile_name = args.profile
+    canonical = os.path.realpath(args.dir or os.getcwd())
+    directory = Path(canonical)
+
+    # Verify profile exists
+    profile = profiles.load_profile(profile_name, debug=debug)
+    if profile is None:
+        print(f"Error: Profile not found: {profile_name}", file=sys.stderr)
+        return 1
+
+    envrc_path = directory / ".envrc"
+    envrc_user_path = directory / ".envrc.user"
+    gitignore_path = directory / ".gitignore"
+
+    created_envrc = False
+
+    # Create .envrc if missing; the token is only needed (and hashed) on first setup
+    if not envrc_path.exists():
+        token = hashlib.blake2b(os.fsencode(canonical), digest_size=8).hexdigest()
+        envrc_content = _ENVRC_TEMPLATE.format(token=token)
+        envrc_path.write_bytes(envrc_content.encode("utf-8"))
+        created_envrc = True
+        print(f"Created: {envrc_path}")
+
+    # Create/update .envrc.user
+    envrc_user_content = _ENVRC_USER_TEMPLATE.format(profile_name=profile_name)
+    if _write_if_changed(envrc_user_path, envrc_user_content):
+        print(f"Created: {envrc_user_path}")
 
     # Update .gitignore
     gitignore_entries = [".envrc.user"]
     if created_envrc:
         gitignore_entries.append(".envrc")
 
-    if gitignore_path.exists():
-        existing = gitignore_path.read_text()
-        lines = existing.splitlines()
-    else:
-        existing = ""
+    try:
+        lines = gitignore_path.read_bytes().decode("utf-8").splitlines()
+    except FileNotFoundError:
         lines = []
 
+    existing_lines = set(lines)
+    added_any = False
     for entry in gitignore_entries:
-        if entry not in lines:
+        if entry not in existing_lines:
             lines.append(entry)
+            existing_lines.add(entry)
+            added_any = True
 
-    new_content = "\n".join(lines)
-    if not new_content.endswith("\n"):
-        new_content += "\n"
-
-    if new_content != existing:
-        gitignore_path.write_text(new_content)
+    # Nothing to add: leave .gitignore (and its mtime) untouched. Otherwise the
+    # content necessarily differs, so write without re-reading it.
+    if added_any:
+        gitignore_path.write_bytes(("\n".join(lines) + "\n").encode("utf-8"))
         print(f"Updated: {gitignore_path}")
 
     print(f"\nProfile '{profile_name}' configured for {directory}")
@@ -361,6 +516,7 @@ export AGENT_SHIM_PROFILE="{profile_name}"
 def cmd_status(args: argparse.Namespace) -> int:
     """Handle status command."""
     import json
+    import time
     from . import state, proxy, profiles
 
     # Handle --health flag: show formatted health endpoint response
@@ -375,95 +531,95 @@ def cmd_status(args: argparse.Namespace) -> int:
     st = state.load_state()
     proxy_status = proxy.get_status()
 
-    print("=== Claude Switch Status ===")
-    print()
+    out = ["=== Claude Switch Status ===", ""]
 
     # Configuration files
-    print("Configuration Files:")
+    out.append("Configuration Files:")
     loaded = profiles.get_loaded_files()
     if loaded["profiles"]:
         for profile_file in loaded["profiles"]:
-            print(f"  Profiles: {profile_file}")
+            out.append(f"  Profiles: {profile_file}")
     if loaded["models"]:
         for model_file in loaded["models"]:
-            print(f"  Models: {model_file}")
+            out.append(f"  Models: {model_file}")
     if not loaded["profiles"] and not loaded["models"]:
-        print("  (none loaded)")
-    print()
+        out.append("  (none loaded)")
+    out.append("")
 
     # Proxy status
-    print("Proxy:")
+    out.append("Proxy:")
     if proxy_status.running:
         health = "healthy" if proxy_status.healthy else "unhealthy"
-        print(f"  Status: running ({health})")
-        print(f"  PID: {proxy_status.pid}")
-        print(f"  URL: {proxy_status.url}")
-        print(f"  Models: {proxy_status.model_count}")
+        out.append(f"  Status: running ({health})")
+        out.append(f"  PID: {proxy_status.pid}")
+        out.append(f"  URL: {proxy_status.url}")
+        out.append(f"  Models: {proxy_status.model_count}")
     else:
-        print("  Status: stopped")
-    print()
+        out.append("  Status: stopped")
+    out.append("")
 
     # Database container status
-    print("Database Container:")
+    out.append("Database Container:")
     if proxy_status.db_status:
         if not proxy_status.db_status.installed:
-            print("  Infrastructure: not installed")
+            out.append("  Infrastructure: not installed")
         elif not proxy_status.db_status.container_exists:
-            print("  Container: not created")
+            out.append("  Container: not created")
         elif not proxy_status.db_status.running:
-            print(f"  Status: stopped (ID: {proxy_status.db_status.container_id})")
+            out.append(f"  Status: stopped (ID: {proxy_status.db_status.container_id})")
         else:
             health = "healthy" if proxy_status.db_status.healthy else "starting"
-            print(f"  Status: running ({health})")
-            print(f"  Container ID: {proxy_status.db_status.container_id}")
+            out.append(f"  Status: running ({health})")
+            out.append(f"  Container ID: {proxy_status.db_status.container_id}")
     else:
-        print("  Status: unknown")
+        out.append("  Status: unknown")
 
     # Database connection status
     db_conn = "connected" if proxy_status.db_healthy else "disconnected"
-    print(f"  Connection: {db_conn}")
+    out.append(f"  Connection: {db_conn}")
 
-    print()
+    out.append("")
 
     # Active tokens
-    print("Active Tokens:")
+    out.append("Active Tokens:")
     if st.active_tokens:
         for token, info in st.active_tokens.items():
-            print(f"  {token[:8]}...: {info.profile} ({info.directory})")
+            out.append(f"  {token[:8]}...: {info.profile} ({info.directory})")
     else:
-        print("  (none)")
+        out.append("  (none)")
 
-    print()
+    out.append("")
 
     # Model refcounts
-    print("Model Refcounts:")
+    out.append("Model Refcounts:")
     if st.model_refcounts:
-        for model, count in sorted(st.model_refcounts.items()):
-            print(f"  {model}: {count}")
+        out.extend([f"  {model}: {count}" for model, count in sorted(st.model_refcounts.items())])
     else:
-        print("  (none)")
+        out.append("  (none)")
 
-    print()
+    out.append("")
 
     # Pending leases
-    print("Pending Leases:")
+    out.append("Pending Leases:")
     if st.model_leases:
         now = time.time()
-        for model, delete_after in sorted(st.model_leases.items()):
-            remaining = int(delete_after - now)
-            if remaining > 0:
-                print(f"  {model}: expires in {remaining}s")
-            else:
-                print(f"  {model}: expired (pending deletion)")
+        out.extend([
+            f"  {model}: expires in {int(delete_after - now)}s"
+            if delete_after - now >= 1
+            else f"  {model}: expired (pending deletion)"
+            for model, delete_after in sorted(st.model_leases.items())
+        ])
     else:
-        print("  (none)")
+        out.append("  (none)")
 
+    sys.stdout.write("\n".join(out) + "\n")
     return 0
 
 
 def cmd_env(args: argparse.Namespace) -> int:
     """Handle env command."""
-    from . import profiles, proxy
+    from . import agent_runner, profiles, proxy
+    profiles.ensure_initialized()
 
     debug = getattr(args, 'debug', False)
     profile_name = args.profile
@@ -473,33 +629,23 @@ def cmd_env(args: argparse.Namespace) -> int:
         print(f"Error: Profile not found: {profile_name}", file=sys.stderr)
         return 1
 
-    # Generate environment variables
-    env_vars = {
-        "ANTHROPIC_AUTH_TOKEN": proxy.get_api_key(),
-        "ANTHROPIC_BASE_URL": proxy.get_proxy_url(),
-        "API_TIMEOUT_MS": "3000000",
-    }
-
-    if profile.meta.haiku_model:
-        env_vars["ANTHROPIC_DEFAULT_HAIKU_MODEL"] = profile.meta.haiku_model
-    if profile.meta.sonnet_model:
-        env_vars["ANTHROPIC_DEFAULT_SONNET_MODEL"] = profile.meta.sonnet_model
-    if profile.meta.opus_model:
-        env_vars["ANTHROPIC_DEFAULT_OPUS_MODEL"] = profile.meta.opus_model
+    # Generate environment variables (same set `with` exports to claude)
+    env_vars = agent_runner.build_env_vars_anthropic(profile, proxy.get_proxy_url(), proxy.get_api_key())
 
     # Output
-    for key, value in env_vars.items():
-        if args.export:
-            print(f'export {key}="{value}"')
-        else:
-            print(f"{key}={value}")
+    if args.export:
+        out = [f'export {key}="{value}"' for key, value in env_vars.items()]
+    else:
+        out = [f"{key}={value}" for key, value in env_vars.items()]
+    sys.stdout.write("\n".join(out) + "\n")
 
     return 0
 
 
 def cmd_run(args: argparse.Namespace) -> int:
     """Handle run command - execute a command with profile environment."""
-    from . import agent_runner
+    from . import agent_runner, profiles
+    profiles.ensure_initialized()
 
     debug = getattr(args, 'debug', False)
 
@@ -689,6 +835,7 @@ def cmd_db(args: argparse.Namespace) -> int:
 def cmd_profiles(args: argparse.Namespace) -> int:
     """Handle profiles commands."""
     from . import profiles
+    profiles.ensure_initialized()
 
     debug = getattr(args, 'debug', False)
 
@@ -708,29 +855,30 @@ def cmd_profiles(args: argparse.Namespace) -> int:
             print(f"Profile not found: {args.name}", file=sys.stderr)
             return 1
 
-        print(f"Profile: {profile.meta.name}")
+        out = [f"Profile: {profile.meta.name}"]
         if profile.source_path:
-            print(f"Loaded from: {profile.source_path}")
+            out.append(f"Loaded from: {profile.source_path}")
 
         # Also show model file sources
         loaded = profiles.get_loaded_files()
         if loaded["models"]:
             for model_file in loaded["models"]:
-                print(f"Models loaded from: {model_file}")
-        print()
-        print("Model Aliases:")
-        print(f"  opus:   {profile.meta.opus_model or '(not set)'}")
-        print(f"  sonnet: {profile.meta.sonnet_model or '(not set)'}")
-        print(f"  haiku:  {profile.meta.haiku_model or '(not set)'}")
+                out.append(f"Models loaded from: {model_file}")
+        out.append("")
+        out.append("Model Aliases:")
+        out.append(f"  opus:   {profile.meta.opus_model or '(not set)'}")
+        out.append(f"  sonnet: {profile.meta.sonnet_model or '(not set)'}")
+        out.append(f"  haiku:  {profile.meta.haiku_model or '(not set)'}")
         if profile.meta.extended:
-            print()
-            print("Extended Models:")
+            out.append("")
+            out.append("Extended Models:")
             for ext_model in profile.meta.extended:
-                print(f"  - {ext_model}")
-        print()
-        print("Models:")
+                out.append(f"  - {ext_model}")
+        out.append("")
+        out.append("Models:")
         for model in profile.model_list:
-            print(f"  - {model.model_name}")
+            out.append(f"  - {model.model_name}")
+        sys.stdout.write("\n".join(out) + "\n")
         return 0
 
     elif args.profiles_command == "install":
@@ -754,6 +902,7 @@ def cmd_profiles(args: argparse.Namespace) -> int:
 def cmd_models(args: argparse.Namespace) -> int:
     """Handle models commands."""
     from . import profiles
+    profiles.ensure_initialized()
 
     if args.models_command == "list":
         available = profiles.list_models()
@@ -771,17 +920,18 @@ def cmd_models(args: argparse.Namespace) -> int:
             print(f"Model definition not found: {args.name}", file=sys.stderr)
             return 1
 
-        print(f"Model: {model_def.model_name}")
+        out = [f"Model: {model_def.model_name}"]
 
         # Show model file sources
         loaded = profiles.get_loaded_files()
         if loaded["models"]:
             for model_file in loaded["models"]:
-                print(f"Loaded from: {model_file}")
-        print()
-        print("LiteLLM Params:")
+                out.append(f"Loaded from: {model_file}")
+        out.append("")
+        out.append("LiteLLM Params:")
         for key, value in model_def.litellm_params.items():
-            print(f"  {key}: {value}")
+            out.append(f"  {key}: {value}")
+        sys.stdout.write("\n".join(out) + "\n")
         return 0
 
     elif args.models_command == "wipe":
@@ -833,6 +983,7 @@ def cmd_models(args: argparse.Namespace) -> int:
 def cmd_install(args: argparse.Namespace) -> int:
     """Install user config templates and infrastructure to user directories."""
     from . import profiles, proxy
+    profiles.ensure_initialized()
 
     debug = getattr(args, 'debug', False)
     config_dir = profiles.get_config_dir()
@@ -7,78 +7,122 @@ Supports both environment variables and dictionary access patterns.
 
 from __future__ import annotations
 
+import functools
 import os
-import secrets
 import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
-try:
-    import yaml
-except ImportError:
-    yaml = None  # type: ignore
+# PyYAML and the secrets module are imported on first use: most commands
+# never parse YAML or generate a password.
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SecretsConfig:
-    """Container for secrets loaded from config file."""
-    _data: dict[str, Any]
+    """Container for secrets loaded from config file.
+
+    Values are stored as strings; unset (None) entries are dropped at load
+    time, so lookups need no per-access coercion.
+    """
+    _data: dict[str, str]
 
     def __getitem__(self, key: str) -> str:
         """Get a secret value by key."""
-        if key not in self._data:
-            raise KeyError(f"Secret key not found: {key}")
-        value = self._data[key]
-        if value is None:
-            raise ValueError(f"Secret key is None: {key}")
-        return str(value)
+        try:
+            return self._data[key]
+        except KeyError:
+            raise KeyError(f"Secret key not found: {key}") from None
 
     def get(self, key: str, default: str | None = None) -> str | None:
         """Get a secret value with optional default."""
-        if key in self._data:
-            value = self._data[key]
-            return str(value) if value is not None else default
-        return default
+        return self._data.get(key, default)
 
     def to_env(self) -> dict[str, str]:
         """Convert secrets to environment variable dict."""
-        env = {}
-        for key, value in self._data.items():
-            if value is not None:
-                env[key] = str(value)
-        return env
+        return dict(self._data)
 
+    def apply_to_environ(self) -> dict[str, str]:
+        """Add secrets that aren't already set to os.environ.
 
-def get_secrets_file() -> Path:
-    """Get path to secrets configuration file.
+        Existing environment variables win. The missing keys are merged in a
+        single update; returns the variables that were added.
+        """
+        environ = os.environ
+        missing = {k: v for k, v in self._data.items() if k not in environ}
+        environ.update(missing)
+        return missing
 
-    Priority order:
-    1. $RUN_CLAUDE_HOME/.secrets (if set)
-    2. $XDG_CONFIG_HOME/run-claude/.secrets (if set)
-    3. ~/.config/run-claude/.secrets (default)
+
+@functools.lru_cache(maxsize=8)
+def _config_file(
+    name: str, run_claude_home: str | None, xdg_config: str | None, home: str | None
+) -> Path:
+    """Resolve a file in the config directory.
+
+    Cached on the environment values it depends on (``home`` is $HOME, which
+    Path.home() reads), so changing any of them is picked up without
+    invalidation.
     """
     # Check RUN_CLAUDE_HOME first (allows custom installation directory)
-    run_claude_home = os.environ.get("RUN_CLAUDE_HOME")
     if run_claude_home:
-        return Path(run_claude_home) / ".secrets"
+        return Path(run_claude_home) / name
 
     # Fall back to XDG_CONFIG_HOME
-    xdg_config = os.environ.get("XDG_CONFIG_HOME")
     if xdg_config:
         base = Path(xdg_config)
     else:
         base = Path.home() / ".config"
-    return base / "run-claude" / ".secrets"
+    return base / "run-claude" / name
+
+
+def _config_path(name: str) -> Path:
+    """Resolve ``name`` in the config directory for the current environment."""
+    environ = os.environ
+    return _config_file(
+        name, environ.get("RUN_CLAUDE_HOME"), environ.get("XDG_CONFIG_HOME"), environ.get("HOME")
+    )
+
+
+def get_secrets_file() -> Path:
+    """Get path to secrets configuration file.
+
+    Priority order:
+    1. $RUN_CLAUDE_HOME/.secrets (if set)
+    2. $XDG_CONFIG_HOME/run-claude/.secrets (if set)
+    3. ~/.config/run-claude/.secrets (default)
+    """
+    return _config_path(".secrets")
 
 
-def _require_yaml() -> None:
-    """Raise error if PyYAML not installed."""
-    if yaml is None:
+def get_env_file() -> Path:
+    """Get path to the Docker Compose .env file (same lookup as .secrets)."""
+    return _config_path(".env")
+
+
+def _require_yaml() -> tuple[Any, Any]:
+    """Import PyYAML, raising an error if it's not installed.
+
+    Returns the module and its fastest safe loader (libyaml-backed
+    CSafeLoader when available, pure-Python SafeLoader otherwise).
+    """
+    try:
+        import yaml
+    except ImportError:
         raise RuntimeError(
             "PyYAML is required for config loading.\n"
             "Install with: pip install pyyaml"
-        )
+        ) from None
+    return yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+_PASSWORD_ALPHABET = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
+# Random bytes map onto the alphabet via bytes.translate; bytes at or above the
+# largest multiple of its length are dropped so every character stays equally
+# likely.
+_PASSWORD_LIMIT = 256 - 256 % len(_PASSWORD_ALPHABET)
+_PASSWORD_TABLE = bytes(_PASSWORD_ALPHABET[b % len(_PASSWORD_ALPHABET)] for b in range(256))
+_PASSWORD_REJECT = bytes(range(_PASSWORD_LIMIT, 256))
 
 
 def generate_random_password(length: int = 32) -> str:
@@ -90,10 +134,100 @@ def generate_random_password(length: int = 32) -> str:
     Returns:
         Random password with mixed case, numbers, and symbols
     """
-    # Use secure random generator
-    alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
-    password = ''.join(secrets.choice(alphabet) for _ in range(length))
-    return password
+    import secrets
+
+    password = b""
+    while len(password) < length:
+        raw = secrets.token_bytes(2 * (length - len(password)))
+        password += raw.translate(_PASSWORD_TABLE, _PASSWORD_REJECT)
+    return password[:length].decode("ascii")
+
+
+# Unquoted scalars that YAML would resolve to something other than a string
+_FLAT_LITERALS: dict[str, Any] = {
+    "": None, "~": None, "null": None, "Null": None, "NULL": None,
+    "true": True, "True": True, "TRUE": True,
+    "false": False, "False": False, "FALSE": False,
+}
+_FLAT_AMBIGUOUS = frozenset(
+    "yes Yes YES no No NO on On ON off Off OFF y Y n N".split()
+)
+
+
+def _parse_flat_yaml(text: str) -> dict[str, Any] | None:
+    """Parse a flat ``KEY: "value"`` YAML document without PyYAML.
+
+    Handles the shape the secrets template uses: comments, blank lines,
+    single/double-quoted or plain string values and the null/bool literals.
+    Returns None as soon as a line needs a real YAML parser (nesting, escapes,
+    numbers, flow collections, ...), so the caller can fall back to PyYAML.
+    """
+    data: dict[str, Any] = {}
+    for line in text.splitlines():
+        if not line or line[0] == "#" or line == "---":
+            continue
+        if line[0] in " \t":
+            if line.strip() and not line.lstrip().startswith("#"):
+                return None
+            continue
+
+        key, sep, value = line.partition(":")
+        key = key.rstrip()
+        if (
+            not sep
+            or not key.replace("_", "").isalnum()
+            or key[0].isdigit()
+            or key in _FLAT_LITERALS
+            or key in _FLAT_AMBIGUOUS
+        ):
+            return None
+        if value and value[0] not in " \t":
+            return None
+        value = value.strip()
+
+        if value[:1] in ("\"", "'"):
+            quote = value[0]
+            end = value.find(quote, 1)
+            if end < 0:
+                return None
+            rest = value[end + 1:].lstrip()
+            if rest and rest[0] != "#":
+                return None
+            inner = value[1:end]
+            if quote == "\"" and "\\" in inner:
+                return None
+            data[key] = inner
+            continue
+
+        value = value.split(" #", 1)[0].split("\t#", 1)[0].rstrip()
+        if value in _FLAT_LITERALS:
+            data[key] = _FLAT_LITERALS[value]
+        elif (
+            value in _FLAT_AMBIGUOUS
+            or ": " in value
+            or value[0] in "0123456789+-.[]{}&*!|>'\"%@`,?:#<=\\"
+        ):
+            return None
+        else:
+            data[key] = value
+    return data
+
+
+@functools.lru_cache(maxsize=8)
+def _load_secrets_cached(path_str: str, mtime_ns: int, debug: bool) -> SecretsConfig:
+    """Read and parse the secrets file; keyed on its mtime so edits are seen."""
+    content = Path(path_str).read_text(encoding="utf-8")
+    data = _parse_flat_yaml(content)
+    if data is None:
+        yaml, loader = _require_yaml()
+        if debug:
+            print(f"DEBUG: Parsing secrets with YAML loader: {loader.__name__}", file=sys.stderr)
+        data = yaml.load(content, Loader=loader) or {}
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Secrets file must contain a YAML dictionary, got {type(data)}")
+
+    return SecretsConfig(_data={k: str(v) for k, v in data.items() if v is not None})
 
 
 def load_secrets(debug: bool = False) -> SecretsConfig:
@@ -108,52 +242,40 @@ def load_secrets(debug: bool = False) -> SecretsConfig:
     RUN_CLAUDE_TIMESCALEDB_PASSWORD: "your-password-here"
     ANTHROPIC_API_KEY: "sk-..."
     OTHER_SECRET: "value"
-    """
-    _require_yaml()
 
+    Flat files like the template are parsed directly; anything richer is
+    handed to PyYAML. The result is cached until the file's mtime changes.
+    """
     secrets_file = get_secrets_file()
 
     if debug:
         print(f"DEBUG: Loading secrets from: {secrets_file}", file=sys.stderr)
-        print(f"DEBUG: Secrets file exists: {secrets_file.exists()}", file=sys.stderr)
 
-    if not secrets_file.exists():
+    try:
+        mtime_ns = secrets_file.stat().st_mtime_ns
+    except FileNotFoundError:
         if debug:
             print(f"DEBUG: Secrets file not found, returning empty config", file=sys.stderr)
         return SecretsConfig(_data={})
 
     try:
-        content = secrets_file.read_text(encoding="utf-8")
-        data = yaml.safe_load(content) or {}
-
-        if not isinstance(data, dict):
-            raise ValueError(f"Secrets file must contain a YAML dictionary, got {type(data)}")
-
-        if debug:
-            keys = list(data.keys())
-            print(f"DEBUG: Loaded secrets with keys: {keys}", file=sys.stderr)
-
-        return SecretsConfig(_data=data)
-
+        config = _load_secrets_cached(str(secrets_file), mtime_ns, debug)
     except Exception as e:
         print(f"Error loading secrets from {secrets_file}: {e}", file=sys.stderr)
         raise
 
+    if debug:
+        keys = list(config._data.keys())
+        print(f"DEBUG: Loaded secrets with keys: {keys}", file=sys.stderr)
 
-def create_secrets_template(generate_passwords: bool = False, expand_vars: bool = False) -> str:
-    """Generate a template .secrets file with documentation.
+    return config
 
-    Args:
-        generate_passwords: If True, generate random passwords for default fields
-        expand_vars: If True, expand any environment variables in values
 
-    Returns:
-        YAML template string with required and optional variables documented
-    """
-    # Generate random password if requested
-    db_password = generate_random_password() if generate_passwords else "your-postgres-password"
+load_secrets.cache_clear = _load_secrets_cached.cache_clear  # type: ignore[attr-defined]
+
 
-    template = f"""# run-claude Secrets Configuration
+# Static parts of the .secrets template; only the password line is rendered
+_SECRETS_TEMPLATE_HEAD = """# run-claude Secrets Configuration
 # Location: ~/.config/run-claude/.secrets
 # Permissions: chmod 600 (owner read/write only)
 #
@@ -185,8 +307,9 @@ def create_secrets_template(generate_passwords: bool = False, expand_vars: bool
 
 # Database password - REQUIRED
 # Generate with: run-claude secrets init --generate
-RUN_CLAUDE_TIMESCALEDB_PASSWORD: "{db_password}"
+"""
 
+_SECRETS_TEMPLATE_TAIL = """
 # API key - REQUIRED
 # Get from: https://console.anthropic.com/api_keys
 ANTHROPIC_API_KEY: "sk-your-key-here"
@@ -206,13 +329,32 @@ ANTHROPIC_API_KEY: "sk-your-key-here"
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 # Examples with environment variable expansion:
-# CUSTOM_PATH: "${{HOME}}/custom"
-# CUSTOM_VALUE: "${{SOME_VAR:-fallback}}"
+# CUSTOM_PATH: "${HOME}/custom"
+# CUSTOM_VALUE: "${SOME_VAR:-fallback}"
 
 # Your custom secrets here:
 # MY_SECRET: "value"
 """
-    return template
+
+
+def create_secrets_template(generate_passwords: bool = False, expand_vars: bool = False) -> str:
+    """Generate a template .secrets file with documentation.
+
+    Args:
+        generate_passwords: If True, generate random passwords for default fields
+        expand_vars: If True, expand any environment variables in values
+
+    Returns:
+        YAML template string with required and optional variables documented
+    """
+    # Generate random password if requested
+    db_password = generate_random_password() if generate_passwords else "your-postgres-password"
+
+    return (
+        _SECRETS_TEMPLATE_HEAD
+        + f'RUN_CLAUDE_TIMESCALEDB_PASSWORD: "{db_password}"\n'
+        + _SECRETS_TEMPLATE_TAIL
+    )
 
 
 def ensure_secrets_template(force: bool = False, generate_passwords: bool = False, debug: bool = False) -> Path:
@@ -234,17 +376,22 @@ def ensure_secrets_template(force: bool = False, generate_passwords: bool = Fals
     if debug:
         print(f"DEBUG: Checking secrets file: {secrets_file}", file=sys.stderr)
 
-    if secrets_file.exists() and not force:
+    # Exclusive create doubles as the existence check (one syscall)
+    mode = "w" if force else "x"
+    try:
+        handle = secrets_file.open(mode, encoding="utf-8")
+    except FileExistsError:
         if debug:
             print(f"DEBUG: Secrets file already exists", file=sys.stderr)
         return secrets_file
-
-    # Create parent directory
-    secrets_file.parent.mkdir(parents=True, exist_ok=True)
+    except FileNotFoundError:
+        # Create parent directory
+        secrets_file.parent.mkdir(parents=True, exist_ok=True)
+        handle = secrets_file.open(mode, encoding="utf-8")
 
     # Write template
-    template = create_secrets_template(generate_passwords=generate_passwords)
-    secrets_file.write_text(template, encoding="utf-8")
+    with handle:
+        handle.write(create_secrets_template(generate_passwords=generate_passwords))
 
     # Restrict permissions to owner only
     try:
@@ -262,6 +409,26 @@ def ensure_secrets_template(force: bool = False, generate_passwords: bool = Fals
     return secrets_file
 
 
+# Characters that would break or change a bare KEY=value line in a .env file
+_ENV_NEEDS_QUOTE = frozenset(" \t\n\r#\"'\\")
+_ENV_ESCAPE = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n", "\r": "\\r"})
+
+
+def _env_value(value: str) -> str:
+    """Quote a .env value when needed, escaping backslashes, quotes and line breaks.
+
+    Docker Compose interpolates ``$`` in bare and double-quoted values, so every
+    ``$`` is doubled except in explicit ``${VAR}`` references, which are kept
+    for interpolation. Generated passwords never contain braces, so their ``$``
+    characters always come through literally.
+    """
+    if "$" in value:
+        value = value.replace("$", "$$").replace("$${", "${")
+    if _ENV_NEEDS_QUOTE.isdisjoint(value):
+        return value
+    return f'"{value.translate(_ENV_ESCAPE)}"'
+
+
 def export_env_file(debug: bool = False) -> Path:
     """
     Export secrets to Docker Compose .env file.
@@ -279,18 +446,7 @@ def export_env_file(debug: bool = False) -> Path:
 
     Returns the path to the generated .env file.
     """
-    # Check RUN_CLAUDE_HOME first (allows custom installation directory)
-    run_claude_home = os.environ.get("RUN_CLAUDE_HOME")
-    if run_claude_home:
-        env_file = Path(run_claude_home) / ".env"
-    else:
-        # Fall back to XDG_CONFIG_HOME
-        xdg_config = os.environ.get("XDG_CONFIG_HOME")
-        if xdg_config:
-            base = Path(xdg_config)
-        else:
-            base = Path.home() / ".config"
-        env_file = base / "run-claude" / ".env"
+    env_file = get_env_file()
 
     if debug:
         print(f"DEBUG: Exporting secrets to env file: {env_file}", file=sys.stderr)
@@ -299,9 +455,9 @@ def export_env_file(debug: bool = False) -> Path:
         secrets = load_secrets(debug=debug)
         env_vars = secrets.to_env()
 
-        # Write .env file - Docker Compose will expand variables automatically
-        lines = [f"{key}={value}" for key, value in env_vars.items()]
-        env_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        # Write .env file - Docker Compose expands the ${VAR} references left in values
+        payload = "".join(f"{key}={_env_value(value)}\n" for key, value in env_vars.items()) or "\n"
+        env_file.write_bytes(payload.encode("utf-8"))
 
         # Restrict permissions for .env file too
         try:
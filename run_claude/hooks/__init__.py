@@ -8,10 +8,11 @@ doesn't break the chain.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, unique
 from typing import Any, Awaitable, Callable
 
 
+@unique
 class HookEvent(Enum):
     """Events that hooks can subscribe to."""
 
@@ -20,8 +21,12 @@ class HookEvent(Enum):
     PRE_TOOL_CALL = "pre_tool_call"  # Before tool execution
     POST_TOOL_CALL = "post_tool_call"  # After tool execution
 
+    # Members are singletons compared by identity, so hash by identity too
+    # instead of Enum's Python-level hash(name) on every dispatch lookup.
+    __hash__ = object.__hash__
 
-@dataclass
+
+@dataclass(slots=True)
 class HookContext:
     """Context passed through the hook chain.
 
@@ -2,13 +2,15 @@
 
 from __future__ import annotations
 
-import copy
 from typing import Any
 
 from . import HookContext
 
 # Providers that need special handling (same set as provider_compat.py)
-STRICT_PROVIDERS = {"groq", "cerebras", "together", "anyscale"}
+STRICT_PROVIDERS = frozenset({"groq", "cerebras", "together", "anyscale"})
+
+# Keys removed from message content blocks for strict providers
+_STRIP_KEYS = frozenset(("provider_specific_fields", "cache_control"))
 
 
 async def log_request(ctx: HookContext) -> HookContext:
@@ -44,57 +46,81 @@ async def strip_provider_fields(ctx: HookContext) -> HookContext:
     Replaces the inline logic from the old provider_compat callback
     for Groq, Cerebras, Together, and Anyscale.
     """
-    if ctx.provider not in STRICT_PROVIDERS:
+    provider = ctx.provider
+    if not provider or provider not in STRICT_PROVIDERS:
         return ctx
 
-    if ctx.messages:
+    # Already-clean requests (the common case) are left untouched
+    if ctx.messages and _messages_need_cleaning(ctx.messages):
         ctx.messages = _clean_messages(ctx.messages)
 
-    if ctx.tools:
+    if ctx.tools and _tools_need_cleaning(ctx.tools):
         ctx.tools = _clean_tools(ctx.tools)
 
     return ctx
 
 
-def _clean_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Remove provider-specific and cache_control fields from messages."""
-    cleaned = []
+def _messages_need_cleaning(messages: list[dict[str, Any]]) -> bool:
+    """Check whether any message carries a field that strict providers reject."""
     for msg in messages:
-        msg_copy = msg.copy()
-        content = msg_copy.get("content")
-
+        if "provider_specific_fields" in msg:
+            return True
+        content = msg.get("content")
         if isinstance(content, list):
-            cleaned_content = []
             for block in content:
-                if isinstance(block, dict):
-                    cleaned_block = {
-                        k: v
-                        for k, v in block.items()
-                        if k not in {"provider_specific_fields", "cache_control"}
-                    }
-                    cleaned_content.append(cleaned_block)
-                else:
-                    cleaned_content.append(block)
-            msg_copy["content"] = cleaned_content
-        elif isinstance(content, dict):
-            msg_copy["content"] = {
-                k: v
-                for k, v in content.items()
-                if k not in {"provider_specific_fields", "cache_control"}
-            }
-
-        msg_copy.pop("provider_specific_fields", None)
-        cleaned.append(msg_copy)
-    return cleaned
+                if isinstance(block, dict) and not _STRIP_KEYS.isdisjoint(block):
+                    return True
+        elif isinstance(content, dict) and not _STRIP_KEYS.isdisjoint(content):
+            return True
+    return False
+
+
+def _tools_need_cleaning(tools: list[dict[str, Any]]) -> bool:
+    """Check whether any tool definition carries cache_control."""
+    for tool in tools:
+        if "cache_control" in tool:
+            return True
+        function = tool.get("function")
+        if isinstance(function, dict) and "cache_control" in function:
+            return True
+    return False
+
+
+def _clean_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Remove provider-specific and cache_control fields from messages."""
+    return [_clean_message(msg) for msg in messages]
+
+
+def _clean_message(msg: dict[str, Any]) -> dict[str, Any]:
+    """Return a copy of one message with stripped content blocks."""
+    msg_copy = msg.copy()
+    content = msg_copy.get("content")
+
+    if isinstance(content, list):
+        msg_copy["content"] = [
+            {k: v for k, v in block.items() if k not in _STRIP_KEYS}
+            if isinstance(block, dict)
+            else block
+            for block in content
+        ]
+    elif isinstance(content, dict):
+        msg_copy["content"] = {k: v for k, v in content.items() if k not in _STRIP_KEYS}
+
+    msg_copy.pop("provider_specific_fields", None)
+    return msg_copy
 
 
 def _clean_tools(tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Remove cache_control from tool definitions."""
+    """Remove cache_control from tool definitions.
+
+    Only the tool dict and its ``function`` dict are modified, so those two
+    levels are copied; everything below is shared with the input.
+    """
     cleaned = []
     for tool in tools:
-        tool_copy = copy.deepcopy(tool)
-        tool_copy.pop("cache_control", None)
-        if "function" in tool_copy and isinstance(tool_copy["function"], dict):
-            tool_copy["function"].pop("cache_control", None)
+        tool_copy = {k: v for k, v in tool.items() if k != "cache_control"}
+        function = tool_copy.get("function")
+        if isinstance(function, dict) and "cache_control" in function:
+            tool_copy["function"] = {k: v for k, v in function.items() if k != "cache_control"}
         cleaned.append(tool_copy)
     return cleaned
@@ -9,6 +9,140 @@ from . import HookContext, HookEvent, HookFn
 logger = logging.getLogger("run-claude.hooks")
 
 
+def _checked_result(name: str, ctx: HookContext, result: object) -> HookContext:
+    """Return the hook's result, or keep ``ctx`` if it didn't return a context.
+
+    Keeps a misbehaving hook (e.g. one that forgets ``return ctx``) from
+    handing ``None`` to the rest of the chain; the error is logged against
+    the hook that produced it.
+    """
+    if isinstance(result, HookContext):
+        return result
+    logger.error(
+        "Hook %s returned %s instead of a HookContext; ignoring its result",
+        name, type(result).__name__,
+    )
+    return ctx
+
+
+def compile_chain(
+    hooks: tuple[tuple[str, HookFn], ...],
+    parallel: tuple[tuple[str, HookFn], ...] = (),
+) -> HookFn:
+    """Build a single hook that runs ``(name, hook)`` pairs in order.
+
+    The pairs are captured in a closure once, so running the chain needs no
+    registry lookups. ``stop_chain`` and per-hook error isolation behave as
+    in :meth:`HookChain.execute`.
+
+    ``parallel`` hooks run concurrently after the serial ones (unless the
+    chain was stopped), each on its own copy of the context. Only the
+    ``metadata`` keys each hook added or replaced are merged back (in
+    registration order); they must not rely on changing ``messages``,
+    ``tools`` or ``response``, or on deleting metadata keys.
+
+    When every hook is a sync function wrapped by the loader (it exposes
+    ``_wrapped_sync``), the chain calls those directly instead of awaiting a
+    coroutine per hook, and the synchronous runner is exposed as the
+    returned function's ``sync`` attribute.
+    """
+    if not parallel:
+        sync_fns = tuple(getattr(hook, "_wrapped_sync", None) for _, hook in hooks)
+        if None not in sync_fns:
+            return _compile_sync_chain(tuple(name for name, _ in hooks), sync_fns)
+
+    # Names are only needed for logging, so keep them out of the hot loop
+    names = tuple(name for name, _ in hooks)
+    fns = tuple(hook for _, hook in hooks)
+    count = len(fns)
+
+    async def run_chain(ctx: HookContext) -> HookContext:
+        # One try block per run (re-entered only after a failure) rather than
+        # one per hook; a failing hook is logged and the chain resumes after it
+        i = 0
+        while i < count:
+            try:
+                while i < count:
+                    if ctx.stop_chain:
+                        logger.debug("Chain stopped before %s", names[i])
+                        return ctx
+                    result = await fns[i](ctx)
+                    ctx = _checked_result(names[i], ctx, result)
+                    i += 1
+            except Exception:
+                logger.error("Hook %s failed", names[i], exc_info=True)
+                # Continue chain — one hook failure doesn't break others
+                i += 1
+        return ctx
+
+    if not parallel:
+        return run_chain
+
+    import asyncio
+    from dataclasses import replace
+
+    parallel_names = tuple(name for name, _ in parallel)
+    parallel_fns = tuple(hook for _, hook in parallel)
+
+    async def run_chain_with_parallel(ctx: HookContext) -> HookContext:
+        ctx = await run_chain(ctx)
+        if ctx.stop_chain:
+            logger.debug("Chain stopped before parallel hooks")
+            return ctx
+
+        metadata = ctx.metadata
+        snapshot = dict(metadata)
+        results = await asyncio.gather(
+            *(hook(replace(ctx, metadata=dict(snapshot))) for hook in parallel_fns),
+            return_exceptions=True,
+        )
+        for name, result in zip(parallel_names, results):
+            if isinstance(result, Exception):
+                logger.error("Hook %s failed", name, exc_info=result)
+            elif isinstance(result, BaseException):
+                raise result
+            elif isinstance(result, HookContext):
+                # Merge only what this hook added or replaced, so one hook's
+                # untouched copy can't overwrite another hook's write
+                for key, value in result.metadata.items():
+                    if key not in snapshot or snapshot[key] is not value:
+                        metadata[key] = value
+            else:
+                _checked_result(name, ctx, result)
+        return ctx
+
+    return run_chain_with_parallel
+
+
+def _compile_sync_chain(names: tuple[str, ...], fns: tuple) -> HookFn:
+    """Build the chain runner for hooks that are all plain sync functions."""
+    count = len(fns)
+
+    def run_sync(ctx: HookContext) -> HookContext:
+        # Same control flow as the async runner in compile_chain
+        i = 0
+        while i < count:
+            try:
+                while i < count:
+                    if ctx.stop_chain:
+                        logger.debug("Chain stopped before %s", names[i])
+                        return ctx
+                    result = fns[i](ctx)
+                    ctx = _checked_result(names[i], ctx, result)
+                    i += 1
+            except Exception:
+                logger.error("Hook %s failed", names[i], exc_info=True)
+                # Continue chain — one hook failure doesn't break others
+                i += 1
+        return ctx
+
+    async def run_chain(ctx: HookContext) -> HookContext:
+        return run_sync(ctx)
+
+    run_chain.sync = run_sync  # type: ignore[attr-defined]
+    return run_chain
+
+
 class HookChain:
     """Execute hooks sequentially with error isolation.
 
@@ -21,33 +155,56 @@ class HookChain:
         self._hooks: dict[HookEvent, list[tuple[str, HookFn]]] = {
             e: [] for e in HookEvent
         }
+        self._parallel: dict[HookEvent, list[tuple[str, HookFn]]] = {
+            e: [] for e in HookEvent
+        }
+        # Per-event runner, recompiled on register (rare) rather than
+        # walking the registry on every request
+        self._compiled: dict[HookEvent, HookFn] = {
+            e: compile_chain(()) for e in HookEvent
+        }
 
-    def register(self, event: HookEvent, name: str, hook: HookFn) -> None:
-        """Register a hook for an event."""
-        self._hooks[event].append((name, hook))
+    def register(
+        self, event: HookEvent, name: str, hook: HookFn, parallel: bool = False
+    ) -> None:
+        """Register a hook for an event.
+
+        ``parallel`` hooks run concurrently after the serial chain; see
+        :func:`compile_chain` for what they may change.
+        """
+        (self._parallel if parallel else self._hooks)[event].append((name, hook))
+        self._compiled[event] = compile_chain(
+            tuple(self._hooks[event]), tuple(self._parallel[event])
+        )
         logger.debug("Registered hook: %s for %s", name, event.value)
 
     async def execute(self, ctx: HookContext) -> HookContext:
         """Run all hooks registered for ``ctx.event`` in order."""
-        for name, hook in self._hooks[ctx.event]:
-            if ctx.stop_chain:
-                logger.debug("Chain stopped before %s", name)
-                break
-            try:
-                ctx = await hook(ctx)
-            except Exception:
-                logger.error("Hook %s failed", name, exc_info=True)
-                # Continue chain — one hook failure doesn't break others
-        return ctx
+        return await self._compiled[ctx.event](ctx)
+
+    def execute_sync(self, ctx: HookContext) -> HookContext:
+        """Run the hooks for ``ctx.event`` without an event loop.
+
+        Only possible when every hook for the event is a sync function
+        (see :meth:`is_sync`); raises RuntimeError otherwise.
+        """
+        run_sync = getattr(self._compiled[ctx.event], "sync", None)
+        if run_sync is None:
+            raise RuntimeError(f"Hooks for {ctx.event.value} include async hooks")
+        return run_sync(ctx)
+
+    def is_sync(self, event: HookEvent) -> bool:
+        """Return True if ``event``'s hooks can run via :meth:`execute_sync`."""
+        return hasattr(self._compiled[event], "sync")
 
     def list_hooks(self, event: HookEvent | None = None) -> list[str]:
         """Return registered hook names, optionally filtered by event."""
         if event:
-            return [name for name, _ in self._hooks[event]]
+            return [name for name, _ in (*self._hooks[event], *self._parallel[event])]
         return [
             f"{e.value}:{name}"
             for e in HookEvent
-            for name, _ in self._hooks[e]
+            for name, _ in (*self._hooks[e], *self._parallel[e])
         ]
 
 
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
-import asyncio
 import importlib
+import inspect
 import logging
 import os
 import sys
@@ -14,23 +14,23 @@ from .chain import get_hook_chain
 
 logger = logging.getLogger("run-claude.hooks")
 
-try:
-    import yaml
-except ImportError:
-    yaml = None  # type: ignore[assignment]
-
 
 def load_hooks_from_config(config_path: Path) -> int:
     """Load hooks from a YAML config file.
 
     Returns the number of hooks successfully registered.
     """
-    if yaml is None:
+    # Imported here so the CLI doesn't pay for PyYAML unless hooks are configured
+    try:
+        import yaml
+    except ImportError:
         logger.warning("pyyaml not installed — cannot load hooks config")
         return 0
 
+    # Prefer the libyaml-backed C loader; the pure-Python one is much slower
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     try:
-        config = yaml.safe_load(config_path.read_text()) or {}
+        config = yaml.load(config_path.read_text(), Loader=loader) or {}
     except Exception:
         logger.error("Failed to parse hooks config: %s", config_path, exc_info=True)
         return 0
@@ -71,33 +71,67 @@ def load_hooks_from_config(config_path: Path) -> int:
             if hook_config:
                 fn = _wrap_with_config(fn, hook_config)
 
-            chain.register(event, name, fn)
+            chain.register(event, name, fn, parallel=bool(hook_def.get("parallel", False)))
             count += 1
 
     return count
 
 
+# (module, attribute) -> resolved object, shared by hooks from the same module
+_import_cache: dict[tuple[str, str], object] = {}
+
+
+def _cached_import(module_name: str, item_name: str):
+    """Return ``module_name.item_name``, importing the module only once."""
+    key = (module_name, item_name)
+    try:
+        return _import_cache[key]
+    except KeyError:
+        pass
+    modules = sys.modules
+    if module_name not in modules:
+        importlib.import_module(module_name)
+    item = _import_cache[key] = getattr(modules[module_name], item_name)
+    return item
+
+
 def _load_hook_function(hook_def: dict) -> HookFn:
     """Import and return a hook function from a module path."""
-    module = importlib.import_module(hook_def["module"])
-    fn = getattr(module, hook_def["function"])
+    fn = _cached_import(hook_def["module"], hook_def["function"])
 
     # Wrap sync functions as async
-    if not asyncio.iscoroutinefunction(fn):
-        sync_fn = fn
+    if not inspect.iscoroutinefunction(fn):
+        return _sync_shim(fn)
 
-        async def async_wrapper(ctx, _fn=sync_fn):
-            return _fn(ctx)
+    return fn
 
-        return async_wrapper
 
-    return fn
+def _sync_shim(sync_fn) -> HookFn:
+    """Wrap a sync hook as async, keeping the original reachable.
+
+    The chain calls ``_wrapped_sync`` directly when every hook for an event
+    is a shim, skipping a coroutine per hook.
+    """
+
+    async def async_wrapper(ctx, _fn=sync_fn):
+        return _fn(ctx)
+
+    async_wrapper._wrapped_sync = sync_fn  # type: ignore[attr-defined]
+    return async_wrapper
 
 
 def _wrap_with_config(fn: HookFn, hook_config: dict) -> HookFn:
     """Wrap a hook function to inject config into context metadata."""
     original_fn = fn
 
+    sync_fn = getattr(fn, "_wrapped_sync", None)
+    if sync_fn is not None:
+        def configured_sync(ctx, _fn=sync_fn, _cfg=hook_config):
+            ctx.metadata["hook_config"] = _cfg
+            return _fn(ctx)
+
+        return _sync_shim(configured_sync)
+
     async def configured_wrapper(ctx, _fn=original_fn, _cfg=hook_config):
         ctx.metadata["hook_config"] = _cfg
         return await _fn(ctx)
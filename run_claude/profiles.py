@@ -16,16 +16,18 @@ as not found and the search continues to the next file.
 
 from __future__ import annotations
 
+import functools
 import os
 import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
-try:
-    import yaml
-except ImportError:
-    yaml = None  # type: ignore
+# PyYAML is imported by _require_yaml() on first use, so commands that never
+# parse a profile don't pay for it
+yaml: Any = None
+_YAML_LOADER: Any = None
+_YAML_DUMPER: Any = None
 
 
 _initialized = False
@@ -347,17 +349,27 @@ class Profile:
 
 # Cache for model definitions
 _model_definitions_cache: dict[str, ModelDef] | None = None
+_model_definitions_stamp: tuple[tuple[Path, int], ...] = ()
 _loaded_model_files: list[Path] = []
 _loaded_profile_files: dict[str, Path] = {}  # profile_name -> source_path
 
 
 def _require_yaml() -> None:
-    """Raise error if PyYAML not installed."""
-    if yaml is None:
+    """Import PyYAML on first use, raising error if not installed."""
+    global yaml, _YAML_LOADER, _YAML_DUMPER
+    if yaml is not None:
+        return
+    try:
+        import yaml as _yaml
+    except ImportError:
         raise RuntimeError(
             "PyYAML is required for profile loading.\n"
             "Install with: pip install pyyaml"
-        )
+        ) from None
+    # Prefer the libyaml-backed C implementations; the pure-Python ones are much slower
+    _YAML_LOADER = getattr(_yaml, "CSafeLoader", _yaml.SafeLoader)
+    _YAML_DUMPER = getattr(_yaml, "CSafeDumper", _yaml.SafeDumper)
+    yaml = _yaml
 
 
 def load_model_definitions(force_reload: bool = False, debug: bool = False) -> dict[str, ModelDef]:
@@ -371,9 +383,12 @@ def load_model_definitions(force_reload: bool = False, debug: bool = False) -> d
     1. Built-in: <package>/models.yaml
     2. User config: ~/.config/run-claude/models.yaml
     """
-    global _model_definitions_cache, _loaded_model_files
+    global _model_definitions_cache, _model_definitions_stamp, _loaded_model_files
 
-    if _model_definitions_cache is not None and not force_reload:
+    # Load from all sources in priority order; reuse the cache while no file changed
+    model_files = _find_models_files(debug=debug)
+    stamp = _files_stamp(model_files)
+    if _model_definitions_cache is not None and not force_reload and stamp == _model_definitions_stamp:
         return _model_definitions_cache
 
     _require_yaml()
@@ -381,14 +396,12 @@ def load_model_definitions(force_reload: bool = False, debug: bool = False) -> d
     models: dict[str, ModelDef] = {}
     _loaded_model_files = []
 
-    # Load from all sources in priority order
-    model_files = _find_models_files(debug=debug)
     print(f"[MODELS_FILES] Found {len(model_files)} model file(s)", file=sys.stderr)
     for models_file in model_files:
         _loaded_model_files.append(models_file)
         if debug:
             print(f"DEBUG: Loading models file: {models_file}", file=sys.stderr)
-        data = yaml.safe_load(models_file.read_text(encoding="utf-8")) or {}
+        data = yaml.load(models_file.read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
         count = 0
         for model_data in data.get("model_list", []):
             model_def = ModelDef.from_dict(model_data)
@@ -402,6 +415,7 @@ def load_model_definitions(force_reload: bool = False, debug: bool = False) -> d
         print(f"[MODELS_AVAILABLE] Total {len(models)} models: {', '.join(model_names)}", file=sys.stderr)
 
     _model_definitions_cache = models
+    _model_definitions_stamp = stamp
     return models
 
 
@@ -517,25 +531,42 @@ def _is_profile_disabled(profile_data: dict[str, Any] | None) -> bool:
     return False
 
 
-# Cache for loaded profiles files
-_profiles_cache: dict[Path, dict[str, Any]] = {}
+# Cache for loaded profiles files: path -> (mtime_ns, data)
+_profiles_cache: dict[Path, tuple[int | None, dict[str, Any]]] = {}
+
+# All profiles files merged by priority: (files stamp, {name: (source, data)})
+_merged_profiles_cache: tuple[
+    tuple[tuple[Path, int], ...], dict[str, tuple[Path, dict[str, Any]]]
+] | None = None
 
 
 def clear_caches() -> None:
     """Clear all in-memory caches for model and profile definitions."""
-    global _model_definitions_cache, _loaded_model_files
+    global _model_definitions_cache, _loaded_model_files, _merged_profiles_cache
     _model_definitions_cache = None
+    _merged_profiles_cache = None
     try:
         _loaded_model_files.clear()
     except Exception:
         pass
     _profiles_cache.clear()
+    _load_profile_cached.cache_clear()
 
 
-def _load_profiles_file(path: Path, debug: bool = False) -> dict[str, Any]:
-    """Load and cache a profiles.yaml file."""
-    if path in _profiles_cache:
-        return _profiles_cache[path]
+def _load_profiles_file(path: Path, debug: bool = False, mtime_ns: int | None = None) -> dict[str, Any]:
+    """Load and cache a profiles.yaml file.
+
+    The cached data is reused while the file's mtime (``mtime_ns`` if the
+    caller already has it) is unchanged.
+    """
+    if mtime_ns is None:
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
+            pass
+    cached = _profiles_cache.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
 
     _require_yaml()
 
@@ -543,16 +574,57 @@ def _load_profiles_file(path: Path, debug: bool = False) -> dict[str, Any]:
         print(f"DEBUG: Loading profiles file: {path}", file=sys.stderr)
 
     try:
-        data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        data = yaml.load(path.read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
     except Exception as e:
         if debug:
             print(f"DEBUG: Error loading {path}: {e}", file=sys.stderr)
         data = {}
 
-    _profiles_cache[path] = data
+    _profiles_cache[path] = (mtime_ns, data)
     return data
 
 
+def _merged_profiles(
+    profiles_stamp: tuple[tuple[Path, int], ...], debug: bool = False
+) -> dict[str, tuple[Path, dict[str, Any]]]:
+    """Return every enabled profile mapped to ``(source_path, data)``.
+
+    Files in ``profiles_stamp`` are walked in priority order and the first
+    enabled entry for a name wins; disabled entries (model: null/false) fall
+    through to lower-priority files. Rebuilt only when the stamp changes.
+    """
+    global _merged_profiles_cache
+    if _merged_profiles_cache is not None and _merged_profiles_cache[0] == profiles_stamp:
+        return _merged_profiles_cache[1]
+
+    merged: dict[str, tuple[Path, dict[str, Any]]] = {}
+    for profiles_file, mtime_ns in profiles_stamp:
+        if debug:
+            print(f"DEBUG: Scanning {profiles_file} for profiles", file=sys.stderr)
+        for name, profile_data in _load_profiles_file(profiles_file, debug, mtime_ns).items():
+            if name in merged:
+                continue
+            if _is_profile_disabled(profile_data):
+                if debug:
+                    print(f"DEBUG: Profile '{name}' is disabled in {profiles_file}, continuing search", file=sys.stderr)
+                continue
+            merged[name] = (profiles_file, profile_data)
+
+    _merged_profiles_cache = (profiles_stamp, merged)
+    return merged
+
+
+def _files_stamp(paths: list[Path]) -> tuple[tuple[Path, int], ...]:
+    """Return (path, mtime_ns) for each path that still exists, in order."""
+    stamp = []
+    for path in paths:
+        try:
+            stamp.append((path, path.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(stamp)
+
+
 def load_profile(name: str, debug: bool = False) -> Profile | None:
     """
     Load a profile by name using fall-through logic.
@@ -567,39 +639,51 @@ def load_profile(name: str, debug: bool = False) -> Profile | None:
     as not found and the search continues to the next file.
 
     After loading, resolves model references from model definitions.
+    Results are cached per process and invalidated when any profiles or
+    models file's mtime changes (or by clear_caches()).
     """
-    global _loaded_profile_files
     _require_yaml()
 
     if debug:
         print(f"DEBUG: Loading profile '{name}'", file=sys.stderr)
         print(f"DEBUG: __file__ = {__file__}", file=sys.stderr)
 
-    # Search through all profile files in priority order
-    for profiles_file in _get_profiles_files(debug=debug):
-        profiles_data = _load_profiles_file(profiles_file, debug=debug)
-
-        if name in profiles_data:
-            profile_data = profiles_data[name]
-
-            if debug:
-                print(f"DEBUG: Found '{name}' in {profiles_file}", file=sys.stderr)
-
-            # Check if profile is disabled (null/false model)
-            if _is_profile_disabled(profile_data):
-                if debug:
-                    print(f"DEBUG: Profile '{name}' is disabled in {profiles_file}, continuing search", file=sys.stderr)
-                continue
+    profile = _load_profile_cached(
+        name,
+        _files_stamp(_get_profiles_files(debug=debug)),
+        _files_stamp(_find_models_files(debug=debug)),
+        debug,
+    )
+    if profile is not None:
+        # Track which profile file was loaded
+        _loaded_profile_files[name] = profile.source_path
+    return profile
 
-            # Track which profile file was loaded
-            _loaded_profile_files[name] = profiles_file
 
-            # Load the profile
-            return _load_profile_from_data(name, profile_data, profiles_file, debug=debug)
+@functools.lru_cache(maxsize=32)
+def _load_profile_cached(
+    name: str,
+    profiles_stamp: tuple[tuple[Path, int], ...],
+    models_stamp: tuple[tuple[Path, int], ...],
+    debug: bool = False,
+) -> Profile | None:
+    """Search the profiles files in ``profiles_stamp`` for ``name`` and load it.
+
+    ``models_stamp`` is only part of the cache key, so edits to models.yaml
+    re-resolve the profile's models.
+    """
+    entry = _merged_profiles(profiles_stamp, debug=debug).get(name)
+    if entry is None:
+        if debug:
+            print(f"DEBUG: Profile '{name}' not found in any file", file=sys.stderr)
+        return None
 
+    profiles_file, profile_data = entry
     if debug:
-        print(f"DEBUG: Profile '{name}' not found in any file", file=sys.stderr)
-    return None
+        print(f"DEBUG: Found '{name}' in {profiles_file}", file=sys.stderr)
+
+    # Load the profile
+    return _load_profile_from_data(name, profile_data, profiles_file, debug=debug)
 
 
 def _load_profile_from_data(
@@ -655,7 +739,7 @@ def load_profile_file(path: Path, debug: bool = False) -> Profile:
     if debug:
         print(f"DEBUG: Loading profile file: {path}", file=sys.stderr)
 
-    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    data = yaml.load(path.read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
     profile = Profile.from_dict(data, source_path=path)
 
     # Use filename as name if not specified in meta
@@ -675,24 +759,7 @@ def list_profiles(debug: bool = False) -> list[str]:
     Collects profile names from all profiles.yaml files, excluding
     disabled profiles (those with model: null or model: false).
     """
-    profiles = set()
-
-    for profiles_file in _get_profiles_files(debug=debug):
-        if debug:
-            print(f"DEBUG: Scanning {profiles_file} for profiles", file=sys.stderr)
-
-        profiles_data = _load_profiles_file(profiles_file, debug=debug)
-
-        for name, profile_data in profiles_data.items():
-            # Skip disabled profiles
-            if _is_profile_disabled(profile_data):
-                if debug:
-                    print(f"DEBUG: Skipping disabled profile: {name}", file=sys.stderr)
-                continue
-
-            if debug:
-                print(f"DEBUG: Found profile: {name}", file=sys.stderr)
-            profiles.add(name)
+    profiles = _merged_profiles(_files_stamp(_get_profiles_files(debug=debug)), debug=debug)
 
     if debug:
         print(f"DEBUG: Total profiles found: {len(profiles)}", file=sys.stderr)
@@ -717,6 +784,7 @@ def install_profile(name: str, profile_data: dict[str, Any]) -> Path:
     Returns:
         Path to the user.profiles.yaml file
     """
+    global _merged_profiles_cache
     _require_yaml()
 
     user_profiles_file = get_user_profiles_override_file()
@@ -724,7 +792,7 @@ def install_profile(name: str, profile_data: dict[str, Any]) -> Path:
 
     # Load existing profiles or start fresh
     if user_profiles_file.exists():
-        existing = yaml.safe_load(user_profiles_file.read_text(encoding="utf-8")) or {}
+        existing = yaml.load(user_profiles_file.read_text(encoding="utf-8"), Loader=_YAML_LOADER) or {}
     else:
         existing = {}
 
@@ -733,13 +801,13 @@ def install_profile(name: str, profile_data: dict[str, Any]) -> Path:
 
     # Write back
     user_profiles_file.write_text(
-        yaml.safe_dump(existing, default_flow_style=False, allow_unicode=True),
+        yaml.dump(existing, Dumper=_YAML_DUMPER, default_flow_style=False, allow_unicode=True),
         encoding="utf-8"
     )
 
     # Clear cache
-    if user_profiles_file in _profiles_cache:
-        del _profiles_cache[user_profiles_file]
+    _profiles_cache.pop(user_profiles_file, None)
+    _merged_profiles_cache = None
 
     return user_profiles_file
 
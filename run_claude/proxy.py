@@ -6,9 +6,11 @@ Handles starting, stopping, health checks, and model management via API.
 
 from __future__ import annotations
 
+import functools
 import json
 import os
 import signal
+import stat
 import subprocess
 import sys
 import tempfile
@@ -73,6 +75,7 @@ def get_proxy_url() -> str:
     return os.environ.get("LITELLM_PROXY_URL", DEFAULT_PROXY_URL)
 
 
+@functools.cache
 def get_master_key() -> str:
     """Get proxy master key from environment, secrets file, or default."""
     if "LITELLM_MASTER_KEY" in os.environ:
@@ -233,11 +236,8 @@ def generate_litellm_config(model_defs: list[dict[str, Any]] | None = None) -> P
     # Load secrets from config file
     try:
         secrets = load_secrets(debug=False)
-        env_vars = secrets.to_env()
         # Update environment with loaded secrets
-        for key, value in env_vars.items():
-            if key not in os.environ:
-                os.environ[key] = value
+        secrets.apply_to_environ()
     except Exception as e:
         # Secrets file may not exist or be empty, continue with existing env vars
         if "--debug" in sys.argv or "-d" in sys.argv:
@@ -770,8 +770,12 @@ def stop_proxy() -> bool:
         return False
 
 
-def get_status() -> ProxyStatus:
-    """Get proxy status."""
+def get_proxy_status() -> ProxyStatus:
+    """Get proxy process/health status only (db fields left at defaults).
+
+    Skips the database connection test and container probe; use get_status()
+    when those are needed.
+    """
     pid = get_proxy_pid()
     running = pid is not None
     healthy = health_check() if running else False
@@ -781,20 +785,23 @@ def get_status() -> ProxyStatus:
         models = list_models()
         model_count = len(models)
 
-    db_healthy = test_db_connection(debug=True)
-    db_status = get_db_status()
-
     return ProxyStatus(
         running=running,
         pid=pid,
         healthy=healthy,
         url=get_proxy_url(),
         model_count=model_count,
-        db_healthy=db_healthy,
-        db_status=db_status,
     )
 
 
+def get_status() -> ProxyStatus:
+    """Get proxy status, including database connection and container status."""
+    status = get_proxy_status()
+    status.db_healthy = test_db_connection(debug=True)
+    status.db_status = get_db_status()
+    return status
+
+
 def list_models() -> list[dict[str, Any]]:
     """Get list of models registered with proxy."""
     if httpx is None:
@@ -1032,12 +1039,25 @@ def wipe_all_models(debug: bool = False) -> tuple[int, int]:
     return (deleted, failed)
 
 
-def ensure_models(model_defs: list[dict[str, Any]], debug: bool = False, wait_for_recovery: bool = False, force: bool = False) -> tuple[int, int]:
+def _model_def_name(model_def: Any) -> str:
+    """Get model_name from a model definition dict or ModelDef-like object."""
+    if isinstance(model_def, dict):
+        return model_def.get("model_name", "")
+    return model_def.model_name
+
+
+def _model_def_dict(model_def: Any) -> dict[str, Any]:
+    """Get a model definition as a dict (calls to_dict() on ModelDef-like objects)."""
+    return model_def if isinstance(model_def, dict) else model_def.to_dict()
+
+
+def ensure_models(model_defs: list[Any], debug: bool = False, wait_for_recovery: bool = False, force: bool = False) -> tuple[int, int]:
     """
     Ensure models are registered with proxy.
 
     Args:
-        model_defs: List of model definitions
+        model_defs: List of model definitions, as dicts or objects with
+            ``model_name`` and ``to_dict()`` (only converted when added)
         debug: If True, print debug info for each model
         wait_for_recovery: If True, wait for proxy to recover before returning
         force: If True, delete existing registrations by name before re-adding
@@ -1048,11 +1068,11 @@ def ensure_models(model_defs: list[dict[str, Any]], debug: bool = False, wait_fo
     print(f"[ENSURE_MODELS] Processing {len(model_defs)} model(s) (force={force})", file=sys.stderr)
 
     # Log all model definitions in YAML format
-    if model_defs and yaml is not None:
+    if debug and model_defs and yaml is not None:
         print(f"[MODELS_YAML_LIST]", file=sys.stderr)
         for i, model_def in enumerate(model_defs):
             print(f"--- Model {i + 1} ---", file=sys.stderr)
-            print(yaml.dump(model_def, default_flow_style=False), file=sys.stderr)
+            print(yaml.dump(_model_def_dict(model_def), default_flow_style=False), file=sys.stderr)
 
     # If wait_for_recovery enabled, wait for proxy to become healthy
     if wait_for_recovery:
@@ -1060,7 +1080,7 @@ def ensure_models(model_defs: list[dict[str, Any]], debug: bool = False, wait_fo
 
     # When forcing, delete any existing registrations matching the names we're about to add
     if force:
-        target_names = {m.get("model_name", "") for m in model_defs if m.get("model_name")}
+        target_names = {name for name in map(_model_def_name, model_defs) if name}
         for existing_model in list_models():
             name = existing_model.get("model_name")
             model_id = existing_model.get("model_info", {}).get("id")
@@ -1077,13 +1097,13 @@ def ensure_models(model_defs: list[dict[str, Any]], debug: bool = False, wait_fo
     failed = 0
 
     for model_def in model_defs:
-        model_name = model_def.get("model_name", "")
+        model_name = _model_def_name(model_def)
         if model_name in existing:
             print(f"[SKIP] Model '{model_name}' already registered", file=sys.stderr)
             skipped += 1
             continue
 
-        if add_model(model_def, debug=debug):
+        if add_model(_model_def_dict(model_def), debug=debug):
             added += 1
         else:
             failed += 1
@@ -1128,11 +1148,8 @@ def test_db_connection(debug: bool = False) -> bool:
     try:
         from .config import load_secrets
         secrets = load_secrets(debug=False)
-        env_vars = secrets.to_env()
         # Update environment with loaded secrets
-        for key, value in env_vars.items():
-            if key not in os.environ:
-                os.environ[key] = value
+        secrets.apply_to_environ()
     except Exception as e:
         # Secrets file may not exist or be empty, continue with existing env vars
         if debug:
@@ -1273,6 +1290,15 @@ def is_docker_running() -> bool:
         return False
 
 
+def _fast_copy(src: str | Path, dst: str | Path) -> None:
+    """Copy a small file in one read/write, preserving its mode bits and timestamps."""
+    src, dst = Path(src), Path(dst)
+    dst.write_bytes(src.read_bytes())
+    st = src.stat()
+    os.chmod(dst, stat.S_IMODE(st.st_mode))
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
 def install_infrastructure(force: bool = False, debug: bool = False) -> bool:
     """
     Install docker-compose files to state directory.
@@ -1309,14 +1335,14 @@ def install_infrastructure(force: bool = False, debug: bool = False) -> bool:
         # Copy docker-compose.yaml
         src_compose = builtin_dep / "docker-compose.yaml"
         if src_compose.exists():
-            shutil.copy2(src_compose, dep_dir / "docker-compose.yaml")
+            _fast_copy(src_compose, dep_dir / "docker-compose.yaml")
             if debug:
                 print(f"Installed: {dep_dir / 'docker-compose.yaml'}", file=sys.stderr)
 
         # Copy docker-compose.override.yaml
         src_override = builtin_dep / "docker-compose.override.yaml"
         if src_override.exists():
-            shutil.copy2(src_override, dep_dir / "docker-compose.override.yaml")
+            _fast_copy(src_override, dep_dir / "docker-compose.override.yaml")
             if debug:
                 print(f"Installed: {dep_dir / 'docker-compose.override.yaml'}", file=sys.stderr)
 
@@ -1327,7 +1353,7 @@ def install_infrastructure(force: bool = False, debug: bool = False) -> bool:
             if dst_config.exists() and force:
                 shutil.rmtree(dst_config)
             if not dst_config.exists():
-                shutil.copytree(src_config, dst_config)
+                shutil.copytree(src_config, dst_config, copy_function=_fast_copy)
                 if debug:
                     print(f"Installed: {dst_config}", file=sys.stderr)
 
@@ -1643,11 +1669,8 @@ def run_prisma_migrate(debug: bool = False) -> bool:
     try:
         from .config import load_secrets
         secrets = load_secrets(debug=False)
-        env_vars = secrets.to_env()
         # Update environment with loaded secrets
-        for key, value in env_vars.items():
-            if key not in os.environ:
-                os.environ[key] = value
+        secrets.apply_to_environ()
     except Exception as e:
         if debug:
             print(f"Warning: Could not load secrets: {e}", file=sys.stderr)
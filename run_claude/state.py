@@ -13,6 +13,11 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
 
 def get_state_dir() -> Path:
     """Get XDG-compliant state directory."""
@@ -29,6 +34,18 @@ def get_state_file() -> Path:
     return get_state_dir() / "state.json"
 
 
+def get_janitor_stamp_file() -> Path:
+    """Get path to janitor timestamp file (its mtime is the last janitor run)."""
+    return get_state_dir() / "janitor.ts"
+
+
+def touch_janitor_stamp() -> None:
+    """Record a janitor run by bumping the stamp file's mtime."""
+    stamp = get_janitor_stamp_file()
+    stamp.parent.mkdir(parents=True, exist_ok=True)
+    stamp.touch()
+
+
 @dataclass
 class TokenInfo:
     """Information about an active token."""
@@ -87,14 +104,12 @@ class State:
 
 def load_state() -> State:
     """Load state from file, returning empty state if not found."""
-    state_file = get_state_file()
-    if not state_file.exists():
-        return State()
-
     try:
-        data = json.loads(state_file.read_text(encoding="utf-8"))
+        raw = get_state_file().read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         return State.from_dict(data)
-    except (json.JSONDecodeError, OSError):
+    except (ValueError, OSError):
+        # Missing file or corrupt JSON (both decoders raise ValueError subclasses)
         return State()
 
 
@@ -104,10 +119,13 @@ def save_state(state: State) -> None:
     state_dir.mkdir(parents=True, exist_ok=True)
 
     state_file = get_state_file()
-    state_file.write_text(
-        json.dumps(state.to_dict(), indent=2),
-        encoding="utf-8"
-    )
+    if orjson is not None:
+        state_file.write_bytes(orjson.dumps(state.to_dict(), option=orjson.OPT_INDENT_2))
+    else:
+        state_file.write_text(
+            json.dumps(state.to_dict(), indent=2),
+            encoding="utf-8"
+        )
 
 
 def increment_models(state: State, models: list[str]) -> None:
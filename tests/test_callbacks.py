@@ -1,11 +1,15 @@
 """Tests for provider compatibility callbacks."""
 
+import asyncio
+
 import pytest
 
 from run_claude.callbacks.provider_compat import (
+    ProviderCompatCallback,
     _clean_tool_use_blocks,
     _clean_tools_definition,
     _get_provider_from_model,
+    standardize_request,
     transform_request_for_provider,
     STRICT_PROVIDERS,
 )
@@ -119,6 +123,30 @@ class TestCleanToolUseBlocks:
         cleaned = _clean_tool_use_blocks(messages)
         assert cleaned[0]["content"] == "Hello"
 
+    def test_returns_same_list_when_already_clean(self):
+        messages = [
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": [{"type": "text", "text": "Hi"}]},
+        ]
+        assert _clean_tool_use_blocks(messages) is messages
+
+    def test_unchanged_messages_passed_through_by_reference(self):
+        plain = {"role": "user", "content": "Hello"}
+        dirty = {
+            "role": "user",
+            "content": [{"type": "text", "text": "Hi", "cache_control": {}}],
+        }
+        cleaned = _clean_tool_use_blocks([plain, dirty])
+        assert cleaned[0] is plain
+        assert cleaned[1] is not dirty
+        assert "cache_control" not in cleaned[1]["content"][0]
+
+    def test_strips_thinking_blocks_from_message(self):
+        messages = [{"role": "assistant", "content": "Hi", "thinking_blocks": []}]
+        cleaned = _clean_tool_use_blocks(messages)
+        assert "thinking_blocks" not in cleaned[0]
+        assert "thinking_blocks" in messages[0]
+
 
 class TestCleanToolsDefinition:
     """Tests for _clean_tools_definition function."""
@@ -155,6 +183,7 @@ class TestCleanToolsDefinition:
         cleaned = _clean_tools_definition(tools)
 
         assert "cache_control" not in cleaned[0]["function"]
+        assert "cache_control" in tools[0]["function"]
 
     def test_returns_none_for_none_input(self):
         assert _clean_tools_definition(None) is None
@@ -162,6 +191,21 @@ class TestCleanToolsDefinition:
     def test_returns_empty_for_empty_input(self):
         assert _clean_tools_definition([]) == []
 
+    def test_returns_same_list_when_already_clean(self):
+        tools = [{"type": "function", "function": {"name": "search", "parameters": {}}}]
+        assert _clean_tools_definition(tools) is tools
+
+    def test_sees_in_place_changes_to_same_list(self):
+        tools = [{"type": "function", "function": {"name": "search"}, "cache_control": {}}]
+        first = _clean_tools_definition(tools)
+        tools.append({"type": "function", "function": {"name": "fetch", "cache_control": {}}})
+
+        second = _clean_tools_definition(tools)
+
+        assert second is not first
+        assert len(second) == 2
+        assert "cache_control" not in second[1]["function"]
+
 
 class TestTransformRequestForProvider:
     """Tests for transform_request_for_provider function."""
@@ -226,6 +270,72 @@ class TestTransformRequestForProvider:
         assert cleaned_msgs == messages
 
 
+class TestStandardizeRequest:
+    """Tests for standardize_request proxy hook."""
+
+    def test_cleans_kwargs_for_strict_provider(self):
+        params = {
+            "kwargs": {
+                "model": "groq/llama3-8b-8192",
+                "messages": [
+                    {"role": "user", "content": [{"type": "text", "text": "Hi", "cache_control": {}}]}
+                ],
+                "cache_control": {"type": "ephemeral"},
+            }
+        }
+
+        result = standardize_request(params)
+
+        assert "cache_control" not in result["kwargs"]
+        assert "cache_control" not in result["kwargs"]["messages"][0]["content"][0]
+
+    def test_passthrough_for_non_strict_provider(self):
+        params = {"kwargs": {"model": "openai/gpt-4", "cache_control": {}}}
+        result = standardize_request(params)
+        assert "cache_control" in result["kwargs"]
+
+
+class TestProviderCompatCallback:
+    """Tests for ProviderCompatCallback.async_pre_call_hook."""
+
+    def _hook(self, callback, data):
+        return asyncio.run(callback.async_pre_call_hook(None, None, data, "completion"))
+
+    def test_cleans_strict_provider_request(self):
+        data = {"model": "groq/llama3-8b-8192", "cache_control": {}}
+        assert "cache_control" not in self._hook(ProviderCompatCallback(), data)
+
+    def test_clean_request_keeps_list_identity(self):
+        messages = [{"role": "user", "content": "Hello"}]
+        tools = [{"type": "function", "function": {"name": "search"}}]
+        data = {"model": "cerebras/llama3.1-8b", "messages": messages, "tools": tools}
+
+        result = self._hook(ProviderCompatCallback(), data)
+
+        assert result is data
+        assert result["messages"] is messages
+        assert result["tools"] is tools
+
+    def test_model_list_resolves_unprefixed_alias(self):
+        callback = ProviderCompatCallback(model_list=[
+            {"model_name": "fast", "litellm_params": {"model": "groq/llama3-8b-8192"}},
+            {"model_name": "smart", "litellm_params": {"model": "anthropic/claude-3-opus"}},
+        ])
+
+        assert "cache_control" not in self._hook(callback, {"model": "fast", "cache_control": {}})
+        assert "cache_control" in self._hook(callback, {"model": "smart", "cache_control": {}})
+
+    def test_model_list_falls_back_to_provider_prefix(self):
+        callback = ProviderCompatCallback(model_list=[
+            {"model_name": "smart", "litellm_params": {"model": "anthropic/claude-3-opus"}},
+            {"model_name": "groq/*", "litellm_params": {"model": "groq/*"}},
+        ])
+
+        unlisted = {"model": "groq/llama3-70b-8192", "cache_control": {}}
+        assert "cache_control" not in self._hook(callback, unlisted)
+        assert "cache_control" in self._hook(callback, {"model": "openai/gpt-4", "cache_control": {}})
+
+
 class TestStrictProviders:
     """Tests for STRICT_PROVIDERS set."""
 
@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import patch
-from run_claude.cli import main
+from run_claude.cli import main, _build_parser, _ensure_secrets, _fast_args, _sniff_subcommand
 
 
 class TestMain:
@@ -26,6 +26,98 @@ class TestMain:
         assert "invalid choice" in captured.err
 
 
+class TestSniffSubcommand:
+    """Tests for picking the subparser to build."""
+
+    @pytest.mark.parametrize("argv,expected", [
+        (["status"], "status"),
+        (["--debug", "enter", "x"], "enter"),
+        (["enter", "--help"], "enter"),
+        (["-h", "status"], None),
+        (["--debug", "--help", "enter"], None),
+        (["bogus"], None),
+        ([], None),
+    ])
+    def test_sniff(self, argv, expected):
+        assert _sniff_subcommand(argv) == expected
+
+    def test_top_level_help_lists_all_commands(self, capsys):
+        with patch("sys.argv", ["run-claude", "-h", "status"]):
+            with pytest.raises(SystemExit):
+                main()
+        out = capsys.readouterr().out
+        assert "enter" in out
+        assert "profiles" in out
+
+
+class TestFastArgs:
+    """Tests for the argparse bypass used on simple invocations."""
+
+    @pytest.mark.parametrize("argv", [
+        ["status"],
+        ["-d", "profiles", "list"],
+        ["proxy", "health"],
+        ["env", "cerebras"],
+        ["enter", "abc123", "cerebras"],
+        ["leave", "abc123"],
+        ["with", "cerebras"],
+        ["with", "cerebras", "claude", "--resume", "-p"],
+    ])
+    def test_matches_argparse(self, argv):
+        """Fast-path args should be identical to what argparse produces."""
+        fast = _fast_args(argv)
+        assert fast is not None
+        parsed = _build_parser(_sniff_subcommand(argv)).parse_args(argv)
+        assert vars(fast) == vars(parsed)
+
+    @pytest.mark.parametrize("argv", [
+        [],
+        ["--help"],
+        ["env", "cerebras", "--export"],
+        ["enter", "abc123", "cerebras", "--dir", "/tmp"],
+        ["with", "--refresh", "cerebras"],
+        ["status", "--health"],
+        ["unknown"],
+    ])
+    def test_falls_back_to_argparse(self, argv):
+        """Anything with options or unknown words should use argparse."""
+        assert _fast_args(argv) is None
+
+
+class TestEnsureSecrets:
+    """Tests for the secrets-template fast path."""
+
+    def test_creates_template_when_missing(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        _ensure_secrets()
+        assert (tmp_path / ".secrets").exists()
+
+    def test_existing_file_skips_config(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text("KEY: value\n")
+        with patch("run_claude.config.ensure_secrets_template") as ensure:
+            _ensure_secrets()
+        ensure.assert_not_called()
+
+
+class TestOpenCodeCli:
+    """Tests for run-open-code sharing run-claude's parser and dispatch."""
+
+    def test_same_commands_as_run_claude(self):
+        from run_claude import cli, opencode_cli
+
+        assert opencode_cli._PARSER_BUILDERS.keys() == cli._PARSER_BUILDERS.keys()
+        assert opencode_cli._DISPATCH.keys() == cli._DISPATCH.keys()
+
+    def test_with_launches_opencode(self, capsys):
+        from run_claude.opencode_cli import main as opencode_main
+
+        with patch("sys.argv", ["run-open-code", "--help"]), pytest.raises(SystemExit):
+            opencode_main()
+
+        assert "Run OpenCode with a profile" in capsys.readouterr().out
+
+
 class TestEnvCommand:
     """Tests for the env command."""
 
@@ -89,6 +181,26 @@ class TestEnvCommand:
             assert line.startswith("export "), f"Line missing export prefix: {line}"
 
 
+class TestSetFolderCommand:
+    """Tests for the set-folder command."""
+
+    def test_rerun_leaves_files_untouched(self, tmp_path, capsys):
+        """Re-running set-folder with the same profile should not rewrite files."""
+        argv = ["run-claude", "set-folder", "cerebras", "--dir", str(tmp_path)]
+        with patch("sys.argv", argv):
+            assert main() == 0
+        capsys.readouterr()
+        mtimes = {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()}
+
+        with patch("sys.argv", argv):
+            assert main() == 0
+        captured = capsys.readouterr()
+
+        assert "Created:" not in captured.out
+        assert "Updated:" not in captured.out
+        assert {p.name: p.stat().st_mtime_ns for p in tmp_path.iterdir()} == mtimes
+
+
 class TestProfilesCommand:
     """Tests for the profiles command."""
 
@@ -0,0 +1,211 @@
+"""Tests for run_claude.config module."""
+
+import os
+
+import pytest
+import yaml
+
+from run_claude.config import (
+    _parse_flat_yaml,
+    create_secrets_template,
+    ensure_secrets_template,
+    export_env_file,
+    generate_random_password,
+    get_secrets_file,
+    load_secrets,
+)
+
+
+class TestParseFlatYaml:
+    """Tests for the PyYAML-free secrets parser."""
+
+    @pytest.mark.parametrize("text", [
+        create_secrets_template(),
+        create_secrets_template(generate_passwords=True),
+        "",
+        "---\nKEY: value\n",
+        "KEY: \"quoted # not a comment\"  # comment\n",
+        "KEY: 'single'\nOTHER: plain value # comment\n",
+        "EMPTY:\nNULL_KEY: ~\nFLAG: true\nOFF_FLAG: False\n",
+        "URL: https://example.com/path\n",
+        "KEY: first\nKEY: second\n",
+        "  # indented comment\nKEY: value\n",
+    ])
+    def test_matches_yaml(self, text):
+        assert _parse_flat_yaml(text) == (yaml.safe_load(text) or {})
+
+    @pytest.mark.parametrize("text", [
+        "PORT: 5432\n",
+        "ENABLED: yes\n",
+        "KEY: \"escaped\\tvalue\"\n",
+        "KEY: 'it''s'\n",
+        "NESTED:\n  CHILD: value\n",
+        "LIST: [a, b]\n",
+        "KEY:value\n",
+        "MY-KEY: value\n",
+        "KEY: a: b\n",
+        "123: value\n",
+    ])
+    def test_defers_to_yaml(self, text):
+        assert _parse_flat_yaml(text) is None
+
+
+class TestGetSecretsFile:
+    """Tests for get_secrets_file path resolution."""
+
+    def test_follows_environment_changes(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("RUN_CLAUDE_HOME", raising=False)
+        monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+        monkeypatch.setenv("HOME", str(tmp_path / "a"))
+        assert get_secrets_file() == tmp_path / "a" / ".config" / "run-claude" / ".secrets"
+
+        monkeypatch.setenv("HOME", str(tmp_path / "b"))
+        assert get_secrets_file() == tmp_path / "b" / ".config" / "run-claude" / ".secrets"
+
+        monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path / "xdg"))
+        assert get_secrets_file() == tmp_path / "xdg" / "run-claude" / ".secrets"
+
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path / "rc"))
+        assert get_secrets_file() == tmp_path / "rc" / ".secrets"
+
+
+class TestLoadSecrets:
+    """Tests for load_secrets."""
+
+    def test_missing_file_is_empty(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        assert load_secrets().to_env() == {}
+
+    def test_falls_back_to_yaml(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text("API_KEY: \"sk-1\"\nPORT: 5432\n")
+        assert load_secrets().to_env() == {"API_KEY": "sk-1", "PORT": "5432"}
+
+    def test_rejects_non_mapping(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text("- a\n- b\n")
+        with pytest.raises(ValueError):
+            load_secrets()
+
+    def test_reloads_after_edit(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        secrets_file = tmp_path / ".secrets"
+        secrets_file.write_text("KEY: one\n")
+        first = load_secrets()
+        assert load_secrets() is first
+
+        secrets_file.write_text("KEY: two\n")
+        os.utime(secrets_file, ns=(0, secrets_file.stat().st_mtime_ns + 1))
+        assert load_secrets()["KEY"] == "two"
+
+
+class TestGenerateRandomPassword:
+    """Tests for generate_random_password."""
+
+    @pytest.mark.parametrize("length", [0, 1, 32, 200])
+    def test_length_and_alphabet(self, length):
+        password = generate_random_password(length)
+        assert len(password) == length
+        assert set(password) <= set(
+            "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*"
+        )
+
+
+class TestSecretsConfig:
+    """Tests for SecretsConfig access."""
+
+    def test_values_are_strings_and_unset_keys_dropped(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text("PORT: 5432\nEMPTY:\nKEY: value\n")
+        config = load_secrets()
+
+        assert config["PORT"] == "5432"
+        assert config.get("EMPTY", "fallback") == "fallback"
+        assert config.to_env() == {"PORT": "5432", "KEY": "value"}
+        with pytest.raises(KeyError, match="EMPTY"):
+            config["EMPTY"]
+
+
+class TestExportEnvFile:
+    """Tests for export_env_file."""
+
+    def test_writes_key_value_lines(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text("API_KEY: \"sk-1\"\nUSER: postgres\n")
+
+        env_file = export_env_file()
+
+        assert env_file == tmp_path / ".env"
+        assert env_file.read_text() == "API_KEY=sk-1\nUSER=postgres\n"
+
+    def test_quotes_values_that_need_it(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text(
+            "SPACED: 'a b'\nHASH: 'x#y'\nQUOTE: 'say \"hi\"'\nPATH_VAR: '${HOME}/x'\n"
+        )
+
+        env_file = export_env_file()
+
+        assert env_file.read_text() == (
+            'SPACED="a b"\nHASH="x#y"\nQUOTE="say \\"hi\\""\nPATH_VAR=${HOME}/x\n'
+        )
+
+    def test_escapes_dollar_outside_references(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        (tmp_path / ".secrets").write_text("PLAIN: 'ab$cd'\nMIXED: '${HOME}/$x'\n")
+
+        env_file = export_env_file()
+
+        assert env_file.read_text() == "PLAIN=ab$$cd\nMIXED=${HOME}/$$x\n"
+
+    def test_generated_password_survives_interpolation(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        password = "ab$cd" + generate_random_password()
+        (tmp_path / ".secrets").write_text(f"DB_PASSWORD: '{password}'\n")
+
+        value = export_env_file().read_text().rstrip("\n").partition("=")[2]
+
+        if value.startswith('"'):
+            value = value[1:-1]
+        # Docker Compose turns $$ back into a literal $
+        assert "$" not in value.replace("$$", "")
+        assert value.replace("$$", "$") == password
+
+
+class TestEnsureSecretsTemplate:
+    """Tests for ensure_secrets_template."""
+
+    def test_creates_directory_and_template(self, tmp_path, monkeypatch):
+        home = tmp_path / "nested" / "home"
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(home))
+
+        secrets_file = ensure_secrets_template()
+
+        assert secrets_file == home / ".secrets"
+        assert secrets_file.read_text() == create_secrets_template()
+        assert secrets_file.stat().st_mode & 0o777 == 0o600
+
+    def test_keeps_existing_file_unless_forced(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        secrets_file = tmp_path / ".secrets"
+        secrets_file.write_text("KEY: mine\n")
+
+        ensure_secrets_template()
+        assert secrets_file.read_text() == "KEY: mine\n"
+
+        ensure_secrets_template(force=True)
+        assert secrets_file.read_text() == create_secrets_template()
+
+    def test_apply_to_environ_keeps_existing(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUN_CLAUDE_HOME", str(tmp_path))
+        monkeypatch.setenv("RC_TEST_EXISTING", "from-env")
+        # Set then delete so monkeypatch removes the added variable afterwards
+        monkeypatch.setenv("RC_TEST_NEW", "")
+        monkeypatch.delenv("RC_TEST_NEW")
+        (tmp_path / ".secrets").write_text("RC_TEST_EXISTING: secret\nRC_TEST_NEW: added\n")
+
+        added = load_secrets().apply_to_environ()
+
+        assert added == {"RC_TEST_NEW": "added"}
+        assert os.environ["RC_TEST_EXISTING"] == "from-env"
+        assert os.environ["RC_TEST_NEW"] == "added"
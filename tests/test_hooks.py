@@ -8,7 +8,7 @@ import time
 import pytest
 
 from run_claude.hooks import HookContext, HookEvent
-from run_claude.hooks.chain import HookChain, reset_hook_chain
+from run_claude.hooks.chain import HookChain, compile_chain, reset_hook_chain
 from run_claude.hooks.builtin import (
     log_request,
     log_response,
@@ -117,6 +117,65 @@ class TestHookChain:
         ctx = _run(chain.execute(ctx))
         assert ctx.metadata["reached"] is True
 
+    def test_consecutive_failures(self):
+        chain = HookChain()
+        results = []
+
+        async def bad_hook(ctx):
+            results.append("bad")
+            raise ValueError("boom")
+
+        async def good_hook(ctx):
+            results.append("good")
+            return ctx
+
+        chain.register(HookEvent.PRE_REQUEST, "bad1", bad_hook)
+        chain.register(HookEvent.PRE_REQUEST, "bad2", bad_hook)
+        chain.register(HookEvent.PRE_REQUEST, "good", good_hook)
+        chain.register(HookEvent.PRE_REQUEST, "bad3", bad_hook)
+
+        _run(chain.execute(_make_ctx()))
+        assert results == ["bad", "bad", "good", "bad"]
+
+    @pytest.mark.parametrize("sync", [False, True])
+    def test_hook_returning_none_is_isolated(self, sync, caplog):
+        """A hook that forgets to return ctx is blamed and skipped."""
+        from run_claude.hooks.loader import _sync_shim
+
+        results = []
+
+        def forgetful(ctx):
+            results.append("forgetful")
+
+        def good(ctx):
+            results.append("good")
+            ctx.metadata["reached"] = True
+            return ctx
+
+        async def async_forgetful(ctx):
+            return forgetful(ctx)
+
+        async def async_good(ctx):
+            return good(ctx)
+
+        chain = HookChain()
+        if sync:
+            chain.register(HookEvent.PRE_REQUEST, "forgetful", _sync_shim(forgetful))
+            chain.register(HookEvent.PRE_REQUEST, "good", _sync_shim(good))
+            assert chain.is_sync(HookEvent.PRE_REQUEST)
+        else:
+            chain.register(HookEvent.PRE_REQUEST, "forgetful", async_forgetful)
+            chain.register(HookEvent.PRE_REQUEST, "good", async_good)
+
+        with caplog.at_level("ERROR", logger="run-claude.hooks"):
+            ctx = _run(chain.execute(_make_ctx()))
+
+        assert results == ["forgetful", "good"]
+        assert ctx.metadata["reached"] is True
+        assert [r.getMessage() for r in caplog.records] == [
+            "Hook forgetful returned NoneType instead of a HookContext; ignoring its result"
+        ]
+
     def test_stop_chain(self):
         """Setting stop_chain should prevent subsequent hooks from running."""
         chain = HookChain()
@@ -156,6 +215,117 @@ class TestHookChain:
         _run(chain.execute(ctx))
         assert results == ["pre"]
 
+    def test_compile_chain(self):
+        results = []
+
+        async def hook_a(ctx):
+            results.append("a")
+            return ctx
+
+        async def bad_hook(ctx):
+            raise ValueError("boom")
+
+        async def stopper(ctx):
+            ctx.stop_chain = True
+            return ctx
+
+        run = compile_chain((("a", hook_a), ("bad", bad_hook), ("stop", stopper), ("a2", hook_a)))
+
+        ctx = _run(run(_make_ctx()))
+        assert results == ["a"]
+        assert ctx.stop_chain is True
+
+    def test_register_after_execute(self):
+        chain = HookChain()
+        results = []
+
+        async def hook(ctx):
+            results.append(len(results))
+            return ctx
+
+        chain.register(HookEvent.PRE_REQUEST, "first", hook)
+        _run(chain.execute(_make_ctx()))
+        chain.register(HookEvent.PRE_REQUEST, "second", hook)
+        _run(chain.execute(_make_ctx()))
+        assert results == [0, 1, 2]
+
+    def test_parallel_hooks_merge_metadata(self):
+        chain = HookChain()
+        order = []
+
+        async def serial(ctx):
+            order.append("serial")
+            ctx.metadata["serial"] = True
+            return ctx
+
+        async def slow(ctx):
+            await asyncio.sleep(0.01)
+            order.append("slow")
+            ctx.metadata["slow"] = ctx.metadata.get("serial")
+            return ctx
+
+        async def fast(ctx):
+            order.append("fast")
+            ctx.metadata["fast"] = True
+            ctx.messages = []
+            return ctx
+
+        async def bad(ctx):
+            raise ValueError("boom")
+
+        chain.register(HookEvent.PRE_REQUEST, "slow", slow, parallel=True)
+        chain.register(HookEvent.PRE_REQUEST, "fast", fast, parallel=True)
+        chain.register(HookEvent.PRE_REQUEST, "bad", bad, parallel=True)
+        chain.register(HookEvent.PRE_REQUEST, "serial", serial)
+
+        messages = [{"role": "user", "content": "hi"}]
+        ctx = _run(chain.execute(_make_ctx(messages=messages)))
+
+        assert order == ["serial", "fast", "slow"]
+        assert ctx.metadata == {"serial": True, "slow": True, "fast": True}
+        assert ctx.messages is messages
+        assert chain.list_hooks(HookEvent.PRE_REQUEST) == ["serial", "slow", "fast", "bad"]
+
+    def test_parallel_hooks_keep_each_others_writes(self):
+        chain = HookChain()
+
+        async def seed(ctx):
+            ctx.metadata.update(x="orig", y="orig")
+            return ctx
+
+        async def set_x(ctx):
+            ctx.metadata["x"] = "set-by-a"
+            return ctx
+
+        async def set_y(ctx):
+            await asyncio.sleep(0)
+            ctx.metadata["y"] = "set-by-b"
+            return ctx
+
+        chain.register(HookEvent.PRE_REQUEST, "seed", seed)
+        chain.register(HookEvent.PRE_REQUEST, "a", set_x, parallel=True)
+        chain.register(HookEvent.PRE_REQUEST, "b", set_y, parallel=True)
+
+        ctx = _run(chain.execute(_make_ctx()))
+        assert ctx.metadata == {"x": "set-by-a", "y": "set-by-b"}
+
+    def test_parallel_hooks_skipped_when_stopped(self):
+        chain = HookChain()
+
+        async def stopper(ctx):
+            ctx.stop_chain = True
+            return ctx
+
+        async def should_not_run(ctx):
+            ctx.metadata["reached"] = True
+            return ctx
+
+        chain.register(HookEvent.PRE_REQUEST, "stopper", stopper)
+        chain.register(HookEvent.PRE_REQUEST, "after", should_not_run, parallel=True)
+
+        ctx = _run(chain.execute(_make_ctx()))
+        assert "reached" not in ctx.metadata
+
     def test_list_hooks(self):
         chain = HookChain()
 
@@ -243,6 +413,25 @@ class TestStripProviderFields:
         assert "cache_control" not in ctx.tools[0]
         assert "cache_control" not in ctx.tools[0]["function"]
 
+    def test_clean_request_keeps_list_identity(self):
+        messages = [{"role": "user", "content": [{"type": "text", "text": "hi"}]}]
+        tools = [{"type": "function", "function": {"name": "test"}}]
+        ctx = _make_ctx(model="groq/llama3", provider="groq", messages=messages, tools=tools)
+        ctx = _run(strip_provider_fields(ctx))
+        assert ctx.messages is messages
+        assert ctx.tools is tools
+
+    def test_strip_tools_leaves_input_untouched(self):
+        tool = {
+            "type": "function",
+            "function": {"name": "test", "cache_control": {"type": "ephemeral"}},
+            "cache_control": {"type": "ephemeral"},
+        }
+        ctx = _make_ctx(model="groq/llama3", provider="groq", tools=[tool])
+        _run(strip_provider_fields(ctx))
+        assert "cache_control" in tool
+        assert "cache_control" in tool["function"]
+
     def test_passthrough_non_strict_provider(self):
         ctx = _make_ctx(
             model="anthropic/claude",
@@ -429,3 +618,54 @@ hooks:
         chain = get_hook_chain()
         ctx = _make_ctx(model="groq/test", provider="groq")
         ctx = _run(chain.execute(ctx))
+
+    def test_sync_hooks_run_without_event_loop(self, tmp_path):
+        """A chain made only of sync hooks can run via execute_sync."""
+        from run_claude.hooks.loader import load_hooks_from_config
+        from run_claude.hooks.chain import get_hook_chain
+
+        (tmp_path / "rc_sync_hooks.py").write_text(
+            """\
+def mark(ctx):
+    ctx.metadata["seen"] = ctx.metadata["hook_config"]["tag"]
+    return ctx
+
+async def async_mark(ctx):
+    return ctx
+"""
+        )
+        config = tmp_path / "hooks.yaml"
+        config.write_text(
+            f"""\
+python_path:
+  - "{tmp_path}"
+hooks:
+  pre_request:
+    - name: mark
+      module: rc_sync_hooks
+      function: mark
+      config:
+        tag: sync
+  post_response:
+    - name: mark
+      module: rc_sync_hooks
+      function: mark
+      config:
+        tag: sync
+    - name: async_mark
+      module: rc_sync_hooks
+      function: async_mark
+"""
+        )
+
+        assert load_hooks_from_config(config) == 3
+        chain = get_hook_chain()
+
+        assert chain.is_sync(HookEvent.PRE_REQUEST)
+        ctx = chain.execute_sync(_make_ctx())
+        assert ctx.metadata["seen"] == "sync"
+        assert _run(chain.execute(_make_ctx())).metadata["seen"] == "sync"
+
+        assert not chain.is_sync(HookEvent.POST_RESPONSE)
+        with pytest.raises(RuntimeError):
+            chain.execute_sync(_make_ctx(event=HookEvent.POST_RESPONSE))
@@ -0,0 +1,50 @@
+"""Tests for run_claude.profiles module."""
+
+import os
+
+import pytest
+
+from run_claude import profiles
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    """Point the user config directory at an empty temp dir."""
+    monkeypatch.setenv("XDG_CONFIG_HOME", str(tmp_path))
+    profiles.clear_caches()
+    yield tmp_path / "run-claude"
+    profiles.clear_caches()
+
+
+class TestMergedProfiles:
+    """Tests for the merged, mtime-validated profiles cache."""
+
+    def test_priority_and_fall_through(self, config_dir):
+        config_dir.mkdir()
+        (config_dir / "user.profiles.yaml").write_text(
+            "mine:\n  opus_model: override\nfallback:\n  model: null\ngone:\n  model: false\n"
+        )
+        (config_dir / "profiles.yaml").write_text(
+            "mine:\n  opus_model: user\nfallback:\n  opus_model: user\n"
+        )
+
+        merged = profiles._merged_profiles(profiles._files_stamp(profiles._get_profiles_files()))
+
+        assert merged["mine"] == (config_dir / "user.profiles.yaml", {"opus_model": "override"})
+        # Disabled in the override, so the search falls through to profiles.yaml
+        assert merged["fallback"][0] == config_dir / "profiles.yaml"
+        assert "gone" not in merged
+        assert "gone" not in profiles.list_profiles()
+
+    def test_edit_is_picked_up(self, config_dir):
+        config_dir.mkdir()
+        override = config_dir / "user.profiles.yaml"
+        override.write_text("first:\n  opus_model: x\n")
+        assert "first" in profiles.list_profiles()
+
+        override.write_text("second:\n  opus_model: x\n")
+        os.utime(override, ns=(0, override.stat().st_mtime_ns + 1))
+
+        names = profiles.list_profiles()
+        assert "first" not in names
+        assert "second" in names